@@ -0,0 +1,87 @@
+"""
+Time refreshing customer-data.csv after rows are appended, incrementally versus from scratch.
+
+The incremental refresh parses only the appended bytes, updates the imputation sums and
+counts, and merges the new rows into the aggregate cube and the categorical value counts.
+The full refresh parses, imputes and aggregates every row again. Run from the repository root:
+
+    python -m benchmarks.bench_append --scale 100 --append 10000
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from benchmarks.bench_loader import scratch_dir, upscale
+from utils.cube import build_cube
+from utils.pipeline import CUSTOMER_PIPELINE
+from utils.profiling import profile_dataframe, update_profile
+from utils.storage import clear_fingerprints, columnar_path
+from utils.store import appended_since, build_clean_frame, clean_path
+
+SOURCE = "datasets/customer-data.csv"
+CUBE_COLUMNS = ["age", "driving_experience", "education", "income", "married", "vehicle_type", "outcome"]
+SEED = 42
+
+
+def refresh(path, previous=None):
+    """
+    Load the cleaned frame and its cube and profile, extending `previous` when rows were appended.
+    """
+
+    df = build_clean_frame(path, CUSTOMER_PIPELINE)
+    appended = appended_since(path, CUSTOMER_PIPELINE)
+    if previous is None or appended is None:
+        return df, build_cube(df, CUBE_COLUMNS, "outcome"), profile_dataframe(df, parallel=False)
+    _, cube, profile = previous
+    start = appended["start"]
+    cube = cube.merge(build_cube(df.iloc[start:], CUBE_COLUMNS, "outcome"))
+    return df, cube, update_profile(profile, df, start)
+
+
+def time_once(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100, help="Replicate the CSV rows this many times")
+    parser.add_argument("--append", type=int, default=10_000, help="Rows to append")
+    args = parser.parse_args()
+
+    pd.set_option("mode.copy_on_write", True)
+    source = os.path.abspath(SOURCE)
+    new_rows = pd.read_csv(source).sample(args.append, replace=True, random_state=SEED)
+    with scratch_dir() as workdir:
+        csv_path = upscale(source, args.scale, workdir)
+        if csv_path == source:
+            # Never append to the bundled file
+            csv_path = os.path.join(workdir, os.path.basename(source))
+            pd.read_csv(source).to_csv(csv_path, index=False)
+
+        build_time, previous = time_once(lambda: refresh(csv_path))
+        new_rows.to_csv(csv_path, mode="a", header=False, index=False)
+        incremental_time, incremental = time_once(lambda: refresh(csv_path, previous))
+
+        for dest in (columnar_path(csv_path), clean_path(csv_path)):
+            os.remove(dest)
+        clear_fingerprints()
+        full_time, full = time_once(lambda: refresh(csv_path))
+
+        print(f"rows={len(previous[0]):,}  appended={args.append:,}")
+        print(f"{'refresh':<14}{'time':>10}")
+        for name, elapsed in [("initial", build_time), ("incremental", incremental_time), ("full", full_time)]:
+            print(f"{name:<14}{elapsed:>9.3f}s")
+
+        same = all(
+            incremental[1].pair(a, b).equals(full[1].pair(a, b)) for a in CUBE_COLUMNS for b in CUBE_COLUMNS if a != b
+        )
+        print(f"cube matches full refresh: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare resolving sidebar filter combinations with boolean masks against the bitmap index.
+
+Each combination keeps a few levels of up to three categorical columns of the cleaned
+customer data, upscaled by sampling rows with a fixed seed. Run from the repository root:
+
+    python -m benchmarks.bench_filters --rows 1000000 --repeat 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.bitmap import build_bitmap_index
+from utils.pipeline import CUSTOMER_DATA, CUSTOMER_PIPELINE
+from utils.store import build_clean_frame
+
+SEED = 42
+FILTERS = [
+    {"age": ["16-25"]},
+    {"age": ["16-25", "26-39"], "income": ["upper class"]},
+    {"age": ["40-64"], "income": ["poverty", "working class"], "vehicle_type": ["sedan"]},
+]
+
+
+def mask_rows(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, levels in filters.items():
+        mask &= df[column].isin(levels).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    clean = build_clean_frame(CUSTOMER_DATA, CUSTOMER_PIPELINE)
+    df = clean.sample(args.rows, replace=True, random_state=SEED, ignore_index=True)
+    columns = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    build_time, index = best_of(lambda: build_bitmap_index(df, columns), 1)
+
+    print(f"rows={len(df):,}  indexed columns={len(index.columns)}  build={build_time * 1e3:.1f}ms")
+    print(f"{'filters':<10}{'matching':>12}{'mask':>12}{'bitmap rows':>14}{'bitmap count':>14}")
+    for filters in FILTERS:
+        mask_time, expected = best_of(lambda: mask_rows(df, filters), args.repeat)
+        rows_time, rows = best_of(lambda: index.rows(filters), args.repeat)
+        count_time, _ = best_of(lambda: index.count(filters), args.repeat)
+        assert np.array_equal(rows, expected)
+        print(
+            f"{len(filters):<10}{len(rows):>12,}{mask_time * 1e3:>10.2f}ms{rows_time * 1e3:>12.2f}ms"
+            f"{count_time * 1e6:>12.0f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
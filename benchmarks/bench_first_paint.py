@@ -0,0 +1,67 @@
+"""
+Time each page from the start of a run to its first chart, cold and warm.
+
+Every page is rendered headlessly with Streamlit's AppTest. The cold run starts with
+empty Streamlit caches; the warm runs reuse them, like a second visitor would.
+Run from the repository root:
+
+    python -m benchmarks.bench_first_paint --warm 3
+"""
+
+import argparse
+import os
+import sys
+
+from streamlit.testing.v1 import AppTest
+
+from views import PAGES
+
+
+def render_page(name):
+    # Runs inside AppTest, so everything it needs is imported here
+    from utils.registry import CUSTOMER
+    from utils.telemetry import RerunTimer
+    from views import load_page
+    from views.common import PageContext
+
+    timer = RerunTimer(page=name).activate()
+    page = load_page(name)
+    timer.mark("page_imported")
+    page.render(PageContext(CUSTOMER, page.COLUMNS, False, timer))
+    timer.finish()
+
+
+def first_paint(name):
+    at = AppTest.from_function(render_page, args=(name,), default_timeout=600)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{name}: {at.exception[0].message}")
+    return at.session_state["timings"][-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--warm", type=int, default=3, help="Warm runs per page")
+    parser.add_argument("--page", action="append", choices=list(PAGES), help="Only time these pages")
+    args = parser.parse_args()
+
+    # AppTest scripts import the page modules relative to the repository root
+    sys.path.insert(0, os.getcwd())
+    import streamlit as st
+
+    print(f"{'page':<26}{'start':>6}{'import':>10}{'data':>10}{'first chart':>14}")
+    for name in args.page or PAGES:
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        records = [first_paint(name)] + [first_paint(name) for _ in range(args.warm)]
+        for record in [records[0], min(records[1:] or records, key=lambda r: r["marks"]["first_chart"])]:
+            marks = record["marks"]
+            data = marks.get("data_loaded")
+            print(
+                f"{name:<26}{record['start']:>6}{marks['page_imported']:>8.1f}ms"
+                f"{'-' if data is None else f'{data:.1f}ms':>10}{marks['first_chart']:>12.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare the groupby-based imputation engine against the original per-group loop.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_imputation --rows 1000000 --groups 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.imputation import input_missing_values
+
+
+def legacy_input_missing_values(df, target_col, group_col, method="mean"):
+    # The implementation eda.py shipped with: one mask, copy and .loc write per group
+    groups = df[group_col].unique()
+
+    for group in groups:
+        filter = df[group_col] == group
+
+        if method == "mean":
+            replacement_value = df[filter][target_col].mean()
+        elif method == "median":
+            replacement_value = df[filter][target_col].median()
+        elif method == "mode":
+            replacement_value = df[filter][target_col].mode()[0]
+        else:
+            raise ValueError("Invalid method. Choose 'mean', 'median', 'mode', or leave it as None for default behavior.")
+
+        df.loc[filter, target_col] = df.loc[filter, target_col].fillna(replacement_value)
+
+
+def make_frame(rows, groups, missing=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "postal_code": rng.integers(10000, 10000 + groups, rows),
+        "credit_score": rng.random(rows),
+        "annual_mileage": rng.integers(2, 22, rows) * 1000.0,
+    })
+    for col in ["credit_score", "annual_mileage"]:
+        df.loc[rng.random(rows) < missing, col] = np.nan
+    return df
+
+
+def timed(func, df, **kwargs):
+    start = time.perf_counter()
+    func(df, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--groups", type=int, default=1_000)
+    parser.add_argument("--method", default="mean", choices=["mean", "median", "mode"])
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the vectorized engine")
+    args = parser.parse_args()
+
+    base = make_frame(args.rows, args.groups)
+    targets = ["credit_score", "annual_mileage"]
+    print(f"rows={args.rows:,} groups={args.groups:,} method={args.method}")
+
+    vectorized = base.copy()
+    elapsed = timed(input_missing_values, vectorized, target_col=targets, group_col="postal_code", method=args.method)
+    print(f"vectorized (both targets, one call): {elapsed:8.3f}s")
+
+    if args.skip_legacy:
+        return
+
+    legacy = base.copy()
+    elapsed_legacy = sum(
+        timed(legacy_input_missing_values, legacy, target_col=col, group_col="postal_code", method=args.method)
+        for col in targets
+    )
+    print(f"legacy loop (one call per target):   {elapsed_legacy:8.3f}s")
+    print(f"speedup: {elapsed_legacy / elapsed:.1f}x")
+
+    pd.testing.assert_frame_equal(vectorized, legacy)
+    print("results match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare loading customer-data.csv as text against the typed, memory-mapped columnar copy.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_loader --scale 100
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from utils.storage import convert_to_columnar, read_columnar, schema_for
+
+SOURCE = "datasets/customer-data.csv"
+
+
+def upscale(path, scale, workdir):
+    if scale == 1:
+        return path
+    df = pd.read_csv(path)
+    big = pd.concat([df] * scale, ignore_index=True)
+    dest = os.path.join(workdir, os.path.basename(path))
+    big.to_csv(dest, index=False)
+    return dest
+
+
+@contextmanager
+def scratch_dir(path=None):
+    """
+    Work in `path`, or in a temporary folder, putting the working directory back afterwards.
+
+    The app caches its columnar files relative to the working directory, so this keeps
+    the benchmark's files out of the app's cache directory.
+    """
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = os.path.abspath(path or tmp)
+        os.chdir(workdir)
+        try:
+            yield workdir
+        finally:
+            os.chdir(cwd)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the CSV rows this many times")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = upscale(SOURCE, args.scale, workdir)
+        dest = os.path.join(workdir, "customer-data.feather")
+        schema = schema_for(SOURCE)
+
+        csv_time, csv_df = best_of(lambda: pd.read_csv(csv_path), args.repeat)
+        convert_time, _ = best_of(lambda: convert_to_columnar(csv_path, dest, schema=schema), 1)
+        columnar_time, columnar_df = best_of(lambda: read_columnar(dest), args.repeat)
+
+        print(f"rows={len(csv_df):,}  csv={os.path.getsize(csv_path) / 1e6:.1f}MB  feather={os.path.getsize(dest) / 1e6:.1f}MB")
+        print(f"{'path':<24}{'time':>10}{'memory':>12}")
+        print(f"{'read_csv (inferred)':<24}{csv_time:>9.3f}s{megabytes(csv_df):>10.1f}MB")
+        print(f"{'read_columnar (mmap)':<24}{columnar_time:>9.3f}s{megabytes(columnar_df):>10.1f}MB")
+        print(f"one-off conversion: {convert_time:.3f}s")
+        print(f"load speedup: {csv_time / columnar_time:.1f}x, memory reduction: {megabytes(csv_df) / megabytes(columnar_df):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compare serial and process-pool profiling of every column of the customer data.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_profiling --scale 100 --workers 4
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from utils.pipeline import CUSTOMER_PIPELINE, preprocess
+from utils.profiling import profile_dataframe
+from utils.storage import load_dataset
+
+SOURCE = "datasets/customer-data.csv"
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100, help="Replicate the rows this many times")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    df = preprocess(load_dataset(SOURCE), CUSTOMER_PIPELINE)
+    df = pd.concat([df] * args.scale, ignore_index=True)
+    print(f"rows={len(df):,} columns={len(df.columns)} workers={args.workers} cpus={os.cpu_count()}")
+
+    serial_time, serial = timed(lambda: profile_dataframe(df, parallel=False))
+    parallel_time, parallel = timed(lambda: profile_dataframe(df, workers=args.workers, min_rows=0))
+    print(f"serial:   {serial_time:8.3f}s")
+    print(f"parallel: {parallel_time:8.3f}s")
+    print(f"speedup: {serial_time / parallel_time:.2f}x")
+
+    pd.testing.assert_frame_equal(serial.summary(), parallel.summary())
+    print("profiles match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measure the memory each extra session costs with per-session copies versus the shared store.
+
+`st.cache_data` unpickles a fresh copy of its return value for every caller, so each
+session used to hold its own copy of the cleaned frame. The shared store hands every
+session the same memory-mapped frame instead. Every session is a headless AppTest run
+that loads the frame through the app's `load_clean_data`, or through `st.cache_data`
+for the per-session copy, and keeps what it derived in its session state.
+Run from the repository root:
+
+    python -m benchmarks.bench_sessions --scale 50 --sessions 20
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_loader import scratch_dir, upscale
+from utils.pipeline import CUSTOMER_PIPELINE
+from utils.store import load_clean_data
+
+SOURCE = "datasets/customer-data.csv"
+MODES = {"per-session copy": "copy", "shared store": "shared"}
+
+
+def open_session(path, mode):
+    # Runs inside AppTest, so everything it needs is imported here
+    import streamlit as st
+
+    from utils.pipeline import CUSTOMER_PIPELINE
+    from utils.store import build_clean_frame, load_clean_data
+
+    @st.cache_data(show_spinner=False)
+    def copied_clean_data(path, config):
+        return build_clean_frame(path, config)
+
+    if mode == "copy":
+        df = copied_clean_data(path, CUSTOMER_PIPELINE)
+    else:
+        df = load_clean_data(path, CUSTOMER_PIPELINE)[0]
+
+    # What a typical page does with the frame: select columns, derive one and filter rows
+    frame = df[["credit_score", "annual_mileage", "income", "outcome"]]
+    frame["high_mileage"] = frame["annual_mileage"] > frame["annual_mileage"].median()
+    st.session_state["frame"] = df
+    st.session_state["selection"] = frame[frame["income"] == "upper class"]
+
+
+def run_sessions(path, mode, sessions):
+    """
+    Open `sessions` sessions after a first one fills the cache, keeping each alive.
+
+    Returns:
+    -------
+    tuple of (list of float, float, float)
+        The traced memory in MB after each session, the peak, and the time they took.
+    """
+
+    warm = AppTest.from_function(open_session, args=(path, mode), default_timeout=600)
+    warm.run()
+    alive = []
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    usage = []
+    for _ in range(sessions):
+        at = AppTest.from_function(open_session, args=(path, mode), default_timeout=600)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        alive.append(at)
+        usage.append((tracemalloc.get_traced_memory()[0] - baseline) / 1e6)
+    elapsed = time.perf_counter() - start
+    peak = (tracemalloc.get_traced_memory()[1] - baseline) / 1e6
+    tracemalloc.stop()
+    return usage, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="Replicate the CSV rows this many times")
+    parser.add_argument("--sessions", type=int, default=10)
+    args = parser.parse_args()
+
+    pd.set_option("mode.copy_on_write", True)
+    # AppTest scripts import the app's modules relative to the repository root
+    sys.path.insert(0, os.getcwd())
+    # load_clean_data is cached with Streamlit, which warns when it runs outside an app
+    set_log_level("error")
+    source = os.path.abspath(SOURCE)
+    with scratch_dir() as workdir:
+        csv_path = upscale(source, args.scale, workdir)
+        results = {name: run_sessions(csv_path, mode, args.sessions) for name, mode in MODES.items()}
+        shared = load_clean_data(csv_path, CUSTOMER_PIPELINE)[0]
+
+        print(f"rows={len(shared):,}  frame={shared.memory_usage(deep=True).sum() / 1e6:.1f}MB  sessions={args.sessions}")
+        print(f"{'mode':<20}{'per session':>14}{'total':>10}{'peak':>10}{'time':>10}")
+        for name, (usage, peak, elapsed) in results.items():
+            per_session = usage[-1] / len(usage)
+            print(f"{name:<20}{per_session:>12.2f}MB{usage[-1]:>8.1f}MB{peak:>8.1f}MB{elapsed:>9.3f}s")
+
+        # The shared frame is backed by read-only mapped buffers
+        try:
+            shared["credit_score"].to_numpy()[0] = 0
+            print("warning: shared frame is writable")
+        except ValueError:
+            print("shared frame is read-only")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Benchmark the EDA pipeline on every bundled dataset and on synthetic upscaled copies.
+
+Each dataset goes through the same code as the app: its registry entry (inferred once
+for unregistered files), the typed columnar copy, the cleaned copy built by its own
+pipeline, then the aggregates and chart specs of the pages. The yearly AEP folder goes
+through the Time Series page's loader and rollups instead.
+
+Every stage runs in a fresh process, after the stages before it have left their files
+in a cache folder of its own. The process reports the stage's wall time, untouched by
+any memory tracing, its resident memory before the stage and its peak resident memory
+during it, which also counts allocations made by the CSV parser and Arrow. Rows are
+counted once loaded. Upscaled copies are drawn from the original rows with a fixed
+seed, so runs are reproducible. Run from the repository root:
+
+    python -m benchmarks.bench_suite --rows 1000000 10000000 --output results.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from streamlit.logger import set_log_level
+
+from benchmarks.bench_loader import scratch_dir
+from utils.aggregation import binned_scatter, boxplot_summary, histogram_bins
+from utils.charts import boxplot_chart, density_scatter_chart, histogram_chart
+from utils.cube import build_cube
+from utils.profiling import profile_dataframe
+from utils.registry import get_dataset
+from utils.storage import load_dataset
+from utils.store import column_kinds, load_clean_data
+from utils.timeseries import YEARLY_COLUMNS, YEARLY_FORMAT, build_rollups, load_aep_hourly
+from utils.timing import Timings
+
+DATASETS = {
+    "customer": "datasets/customer-data.csv",
+    "mushroom": "datasets/mushroom_cleaned.csv",
+    "aep-hourly": "datasets/AEP_hourly.csv",
+    "aep-yearly": "datasets/AEP Hourly",
+    "titanic": "datasets/titanic.csv",
+    "superstore": "datasets/sample_-_superstore.xls",
+}
+# Read by the Time Series page rather than listed as a dataset
+TIME_SERIES = {"aep-yearly"}
+
+SEED = 42
+# Bounds the number of column pairs in the aggregate cube
+MAX_CUBE_COLUMNS = 8
+
+
+def as_csv(path, workdir):
+    """
+    The file the app would list for `path`: CSVs as they are, and a CSV copy of a spreadsheet.
+    """
+
+    if not path.endswith((".xls", ".xlsx")):
+        return path
+    dest = os.path.join(workdir, f"{os.path.splitext(os.path.basename(path))[0]}.csv")
+    if not os.path.exists(dest):
+        pd.read_excel(path).to_csv(dest, index=False)
+    return dest
+
+
+def upscale(name, path, rows, workdir):
+    """
+    Write `rows` rows sampled with replacement from the dataset, reusing an earlier copy.
+
+    CSV values are copied as text, so the copy is read with the same schema as the
+    original. The yearly AEP folder becomes a folder with one file in the yearly format.
+    Its loader keeps one reading per hour, so rather than sampling, the series is repeated
+    end to end, each copy shifted past the one before, until it has `rows` distinct hours.
+    """
+
+    base = os.path.splitext(os.path.basename(path.rstrip("/")))[0]
+    if name in TIME_SERIES:
+        folder = os.path.join(workdir, str(rows), base)
+        dest = os.path.join(folder, f"{base}.csv")
+        if not os.path.exists(dest):
+            source = load_aep_hourly(path, legacy_path=None).reset_index()
+            span = source["datetime"].iloc[-1] - source["datetime"].iloc[0] + pd.Timedelta(hours=1)
+            copies = -(-rows // len(source))
+            sample = pd.concat(
+                [source.assign(datetime=source["datetime"] + i * span) for i in range(copies)], ignore_index=True
+            ).head(rows)
+            sample["datetime"] = sample["datetime"].dt.strftime(YEARLY_FORMAT)
+            os.makedirs(folder, exist_ok=True)
+            sample.rename(columns={new: old for old, new in YEARLY_COLUMNS.items()}).to_csv(dest, index=False)
+        return folder
+
+    dest = os.path.join(workdir, str(rows), os.path.basename(path))
+    if not os.path.exists(dest):
+        source = pd.read_csv(path, dtype=str, keep_default_na=False)
+        sample = source.sample(rows, replace=True, random_state=SEED, ignore_index=True)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        sample.to_csv(dest, index=False)
+    return dest
+
+
+def aggregate(dataset, df, path):
+    """
+    The aggregates the pages draw on first, for their default columns.
+    """
+
+    kinds = column_kinds(path, dataset.pipeline)
+    numerical = [col for col, kind in kinds.items() if kind == "numerical"]
+    categorical = [col for col, kind in kinds.items() if kind == "categorical"]
+    key = dataset.default("categorical", categorical)
+    value = dataset.default("numerical", numerical)
+
+    results = {"profile": profile_dataframe(df[numerical + categorical])}
+    cube_columns = [col for col in categorical if col != dataset.target][:MAX_CUBE_COLUMNS]
+    if len(cube_columns) > 1:
+        results["cube"] = build_cube(df, cube_columns, outcome=dataset.target if dataset.target in categorical else None)
+    if value:
+        results["histogram"] = (value, histogram_bins(df[value]))
+        results["boxplot"] = (value, key, boxplot_summary(df, value, key))
+    if len(numerical) > 1:
+        results["scatter"] = (numerical[0], numerical[1], binned_scatter(df, numerical[0], numerical[1]))
+    return results
+
+
+def chart_specs(results):
+    specs = []
+    if "histogram" in results:
+        value, bins = results["histogram"]
+        specs.append(histogram_chart(bins, value).to_json())
+        value, key, (summary, outliers) = results["boxplot"]
+        specs.append(boxplot_chart(summary, outliers, value, group_col=key).to_json())
+    if "scatter" in results:
+        x, y, cells = results["scatter"]
+        specs.append(density_scatter_chart(cells, x, y).to_json())
+    return sum(len(spec.encode()) for spec in specs)
+
+
+def stages_for(name, path):
+    """
+    The stages of one source in order, as (name, func) pairs; each func takes what the one before returned.
+    """
+
+    if name in TIME_SERIES:
+        return [
+            ("load", lambda _: load_aep_hourly(path, legacy_path=None)),
+            ("aggregate", lambda frame: build_rollups(frame)),
+        ]
+    return [
+        ("schema", lambda _: get_dataset(path)),
+        ("load", lambda dataset: (dataset, load_dataset(path))),
+        ("clean", lambda loaded: (loaded[0], load_clean_data(path, loaded[0].pipeline)[0])),
+        ("aggregate", lambda inputs: aggregate(*inputs, path)),
+        ("chart_spec", chart_specs),
+    ]
+
+
+def _status_mb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1e3
+    return None
+
+
+def reset_peak():
+    """
+    Restart the peak resident memory count of this process, returning the resident memory in MB.
+
+    Linux tracks the peak per process image (VmHWM) and lets a process reset it. Elsewhere
+    the peak can only be read as `ru_maxrss`, which also covers what ran before.
+    """
+
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return _status_mb("VmRSS")
+    except OSError:
+        return peak_mb()
+
+
+def peak_mb():
+    try:
+        return _status_mb("VmHWM")
+    except OSError:
+        # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1e6 if sys.platform == "darwin" else 1e3)
+
+
+def run_stage(name, path, index, cache_dir):
+    """
+    Run stage `index` of a source in the current process, after replaying the stages before it.
+
+    The earlier stages find the files they wrote in `cache_dir` and are not measured.
+
+    Returns:
+    -------
+    tuple of (dict, list of dict)
+        The stage's result row, and the instrumented stages recorded while it ran.
+    """
+
+    pd.set_option("mode.copy_on_write", True)
+    # load_clean_data is cached with Streamlit, which warns when it runs outside an app
+    set_log_level("error")
+    os.chdir(cache_dir)
+    stages = stages_for(name, path)
+    value = None
+    for _, func in stages[:index]:
+        value = func(value)
+    before = reset_peak()
+
+    timings = Timings(page=name).activate()
+    start = time.perf_counter()
+    value = stages[index][1](value)
+    elapsed = time.perf_counter() - start
+    row = {"stage": stages[index][0], "seconds": elapsed, "setup_mb": before, "peak_mb": peak_mb()}
+    if row["stage"] == "load":
+        row["rows"] = len(value if name in TIME_SERIES else value[1])
+    if row["stage"] == "chart_spec":
+        row["bytes"] = value
+    return row, timings.stages
+
+
+def run_source(name, path, cache_dir):
+    """
+    Run every stage of one source, each in a fresh process.
+
+    Returns:
+    -------
+    tuple of (list of dict, pandas.DataFrame)
+        One result row per stage, and the instrumented stages recorded along the way.
+    """
+
+    os.makedirs(cache_dir, exist_ok=True)
+    rows, records = [], []
+    context = multiprocessing.get_context("spawn")
+    for index in range(len(stages_for(name, path))):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            row, stage_records = executor.submit(run_stage, name, path, index, cache_dir).result()
+        rows.append(row)
+        records.extend(stage_records)
+
+    # Every stage is labelled with the rows as loaded, e.g. after the AEP loader drops repeated hours
+    n_rows = next(row["rows"] for row in rows if row["stage"] == "load")
+    for row in rows:
+        row.update({"dataset": name, "rows": n_rows})
+    return rows, pd.DataFrame(records, columns=["stage", "ms", "rows", "bytes"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dataset", action="append", choices=list(DATASETS), help="Only run these datasets")
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000_000, 10_000_000], help="Upscaled sizes to run besides the original")
+    parser.add_argument("--workdir", help="Keep the upscaled CSVs here between runs instead of a temporary folder")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    parser.add_argument("--breakdown", action="store_true", help="Print the time of every instrumented stage")
+    args = parser.parse_args()
+
+    paths = {name: os.path.abspath(path) for name, path in DATASETS.items()}
+    with scratch_dir(args.workdir) as workdir:
+        results = []
+        print(f"{'dataset':<12}{'rows':>12}{'stage':>12}{'time':>10}{'setup':>12}{'peak':>12}{'bytes':>10}")
+        for name in args.dataset or DATASETS:
+            path = as_csv(paths[name], workdir)
+            sources = [path] + [upscale(name, path, rows, workdir) for rows in args.rows]
+            for size, source in zip(["original"] + args.rows, sources):
+                rows, timings = run_source(name, source, os.path.join(workdir, "cache", name, str(size)))
+                results.extend(rows)
+                for row in rows:
+                    print(
+                        f"{row['dataset']:<12}{row['rows']:>12,}{row['stage']:>12}{row['seconds']:>9.3f}s"
+                        f"{row['setup_mb']:>10.1f}MB{row['peak_mb']:>10.1f}MB{row.get('bytes', ''):>10}"
+                    )
+                if args.breakdown:
+                    stages = timings.groupby("stage", sort=False)["ms"].agg(calls="size", ms="sum")
+                    print(stages.to_string(float_format="{:.1f}".format), end="\n\n")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from utils.registry import get_dataset
+from utils.storage import load_dataset
+
+
+def test_float_written_codes_stay_numeric(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "codes.csv"
+    path.write_text("label,rating\na,1.0\nb,2.0\na,\nb,3.0\na,1.0\n")
+
+    dataset = get_dataset(str(path))
+    df = load_dataset(str(path))
+
+    assert dataset.schema["rating"] == "float64"
+    assert df["rating"].tolist()[:2] == [1.0, 2.0]
+    assert df["rating"].isna().sum() == 1
+
+
+def test_headerless_file_gets_generated_names(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "headerless.csv"
+    path.write_text("6,148,33.6,1\n1,85,26.6,0\n8,183,23.3,1\n")
+
+    dataset = get_dataset(str(path))
+    df = load_dataset(str(path))
+
+    assert list(dataset.schema) == ["column_1", "column_2", "column_3", "column_4"]
+    assert len(df) == 3
+    assert df["column_3"].tolist() == [33.6, 26.6, 23.3]
+    assert isinstance(df["column_4"].dtype, pd.BooleanDtype)
@@ -0,0 +1,17 @@
+from utils.registry import get_dataset
+from utils.storage import columnar_path, load_dataset
+
+
+def test_same_name_in_different_folders_is_cached_apart(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    first, second = tmp_path / "a" / "data.csv", tmp_path / "b" / "data.csv"
+    for path, rows in [(first, "x,1\ny,2\n"), (second, "z,3\n")]:
+        path.parent.mkdir()
+        path.write_text("name,value\n" + rows)
+
+    for path in (first, second):
+        get_dataset(str(path))
+
+    assert columnar_path(str(first)) != columnar_path(str(second))
+    assert load_dataset(str(first))["value"].tolist() == [1, 2]
+    assert load_dataset(str(second))["value"].tolist() == [3]
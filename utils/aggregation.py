@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from utils.timing import timed
+
+
+def nice_bin_edges(values, maxbins=30):
+    """
+    Bin edges on a "nice" step (1, 2 or 5 times a power of ten), like Vega-Lite's `maxbins`.
+
+    Parameters:
+    ----------
+    values : array-like
+        Numeric values; NaNs are ignored.
+    maxbins : int, optional
+        Upper bound on the number of bins.
+
+    Returns:
+    -------
+    numpy.ndarray
+    """
+
+    values = np.asarray(values, dtype="float64")
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    if lo == hi:
+        return np.array([lo - 0.5, hi + 0.5])
+
+    raw_step = (hi - lo) / maxbins
+    magnitude = 10 ** np.floor(np.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+
+    start = np.floor(lo / step) * step
+    stop = np.ceil(hi / step) * step
+    if stop == hi:
+        # Keep the maximum inside the last half-open bin
+        stop += step
+    return np.arange(start, stop + step / 2, step)
+
+
+def histogram_bins(series, maxbins=30):
+    """
+    Count values per bin so only the bins, not the rows, are sent to the chart.
+
+    Parameters:
+    ----------
+    series : pandas.Series
+        The numeric column.
+    maxbins : int, optional
+        Upper bound on the number of bins.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Columns 'bin_start', 'bin_end' and 'count', one row per bin.
+    """
+
+    values = series.dropna().to_numpy(dtype="float64")
+    if len(values) == 0:
+        return pd.DataFrame({"bin_start": [], "bin_end": [], "count": []})
+
+    edges = nice_bin_edges(values, maxbins)
+    counts, edges = np.histogram(values, bins=edges)
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+
+@timed("boxplot")
+def boxplot_summary(df, value_col, group_col=None, max_outliers=500):
+    """
+    Five-number summary and outliers for a boxplot, optionally per group.
+
+    Whiskers follow Vega-Lite's default: they extend to the most extreme values within
+    1.5 IQR of the quartiles, and anything beyond is an outlier. Outliers are
+    deduplicated and capped at `max_outliers` per group, keeping the most extreme ones,
+    so the result stays small however many rows there are.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data.
+    value_col : str
+        The numeric column.
+    group_col : str, optional
+        The column to split the boxes by.
+    max_outliers : int, optional
+        Maximum number of distinct outlier values kept per group.
+
+    Returns:
+    -------
+    tuple of (pandas.DataFrame, pandas.DataFrame)
+        The summary with 'lower', 'q1', 'median', 'q3' and 'upper' columns, and the
+        outliers with a 'count' column. Both carry `group_col` when it is given.
+    """
+
+    keys = [group_col] if group_col else []
+    data = df[keys + [value_col]].dropna(subset=[value_col])
+    if not keys:
+        data = data.assign(_group=0)
+        keys = ["_group"]
+
+    grouped = data.groupby(keys, observed=True)[value_col]
+    summary = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    summary.columns = ["q1", "median", "q3"]
+    iqr = summary["q3"] - summary["q1"]
+    fence_lo = (summary["q1"] - 1.5 * iqr).reindex(data[keys[0]]).to_numpy()
+    fence_hi = (summary["q3"] + 1.5 * iqr).reindex(data[keys[0]]).to_numpy()
+
+    values = data[value_col].to_numpy()
+    inside = (values >= fence_lo) & (values <= fence_hi)
+    whiskers = data[inside].groupby(keys, observed=True)[value_col].agg(["min", "max"])
+    summary["lower"] = whiskers["min"]
+    summary["upper"] = whiskers["max"]
+    summary = summary[["lower", "q1", "median", "q3", "upper"]].reset_index()
+
+    outliers = data[~inside].groupby(keys + [value_col], observed=True).size().reset_index(name="count")
+    if len(outliers):
+        median = summary.set_index(keys)["median"].reindex(outliers[keys[0]]).to_numpy()
+        outliers["_distance"] = np.abs(outliers[value_col].to_numpy() - median)
+        outliers = (
+            outliers.sort_values("_distance", ascending=False)
+            .groupby(keys, observed=True)
+            .head(max_outliers)
+            .drop(columns="_distance")
+        )
+
+    if group_col is None:
+        summary = summary.drop(columns="_group")
+        outliers = outliers.drop(columns="_group")
+    return summary, outliers.reset_index(drop=True)
+
+
+@timed("scatter")
+def binned_scatter(df, x_col, y_col, bins=60):
+    """
+    Bin two numeric columns into a 2-D grid of counts for a density scatter.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data.
+    x_col, y_col : str
+        The numeric columns.
+    bins : int, optional
+        Number of bins along each axis.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Columns 'x_start', 'x_end', 'y_start', 'y_end' and 'count' for every non-empty cell.
+    """
+
+    data = df[[x_col, y_col]].dropna()
+    x = data[x_col].to_numpy(dtype="float64")
+    y = data[y_col].to_numpy(dtype="float64")
+    if len(x) == 0:
+        return pd.DataFrame({"x_start": [], "x_end": [], "y_start": [], "y_end": [], "count": []})
+
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    xi, yi = np.nonzero(counts)
+    return pd.DataFrame({
+        "x_start": x_edges[xi],
+        "x_end": x_edges[xi + 1],
+        "y_start": y_edges[yi],
+        "y_end": y_edges[yi + 1],
+        "count": counts[xi, yi].astype("int64"),
+    })
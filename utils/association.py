@@ -0,0 +1,215 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.cube import build_cube
+from utils.timing import timed
+
+NUMERIC_METHODS = ("pearson", "spearman")
+# Values per row block, bounding the memory of the matrix products whatever the row count
+BLOCK_CELLS = 4_000_000
+
+
+def _numeric_values(df, columns, method):
+    if method not in NUMERIC_METHODS:
+        raise ValueError("Invalid method. Choose 'pearson' or 'spearman'.")
+    frame = df[columns].astype("float64")
+    # Spearman is Pearson on ranks; ties share their average rank, like `DataFrame.corr`
+    return (frame.rank() if method == "spearman" else frame).to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _centred(df, columns, method):
+    """
+    The values of `columns`, whether each is present, and the values minus their column
+    mean with 0 where missing. Centring first keeps the sums of squares from cancelling out.
+    """
+
+    values = _numeric_values(df, columns, method)
+    present = np.isfinite(values)
+    with np.errstate(all="ignore"):
+        means = np.nanmean(values, axis=0) if len(values) else np.zeros(len(columns))
+    return values, present, np.where(present, values - means, 0.0)
+
+
+def _blocks(n_rows, width):
+    step = max(1, BLOCK_CELLS // max(width, 1))
+    # At least one (possibly empty) block, so the sums keep their shape
+    return [slice(start, min(start + step, n_rows)) for start in range(0, max(n_rows, 1), step)]
+
+
+def _accumulate(blocks, func, workers):
+    """
+    Sum `func(block)` over row blocks, spread across threads.
+
+    The work is in matrix products, which release the GIL, so threads run in parallel
+    without copying the data into worker processes.
+    """
+
+    workers = min(workers or os.cpu_count() or 1, len(blocks))
+    if workers <= 1:
+        parts = [func(block) for block in blocks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(func, blocks))
+    return [sum(items) for items in zip(*parts)]
+
+
+@timed("correlation")
+def correlation_matrix(df, columns, method="pearson", workers=None):
+    """
+    Correlation between every pair of numerical columns, from matrix products over all columns at once.
+
+    Like `DataFrame.corr`, each pair only uses the rows where both values are present.
+    For 'spearman', each column is ranked once over its present values rather than
+    once per pair.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data.
+    columns : list of str
+        The numerical columns.
+    method : str, optional
+        'pearson' or 'spearman'.
+    workers : int, optional
+        Threads to spread the row blocks across. Defaults to the CPU count.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        A square frame indexed by `columns` both ways.
+    """
+
+    values, present, centred = _centred(df, columns, method)
+
+    def products(block):
+        x, m = centred[block], present[block].astype("float64")
+        return m.T @ m, x.T @ m, (x * x).T @ m, x.T @ x
+
+    with np.errstate(all="ignore"):
+        count, sums, squares, cross = _accumulate(_blocks(len(values), len(columns)), products, workers)
+        # sums[i, j] is the sum of column i over the rows where column j is present too
+        covariance = cross - sums * sums.T / count
+        variance = squares - sums ** 2 / count
+        corr = np.clip(covariance / np.sqrt(variance * variance.T), -1, 1)
+    np.fill_diagonal(corr, 1.0)
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+@timed("correlation_ratio")
+def correlation_ratios(df, categorical, numerical, workers=None):
+    """
+    Correlation ratio (eta) between every categorical and every numerical column.
+
+    Eta is the share of a numerical column's spread explained by the levels of a
+    categorical one, from 0 (every level has the same mean) to 1. The per-level sums
+    of all numerical columns against all categorical levels come from one product of
+    a one-hot block and the values, per block of rows.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Indexed by `categorical`, with one column per `numerical` column.
+    """
+
+    values, present, centred = _centred(df, numerical, "pearson")
+
+    # Every level of every categorical column gets its own one-hot column
+    codes = [pd.factorize(df[col], sort=True)[0] for col in categorical]
+    offsets = np.cumsum([0] + [level_codes.max() + 1 if len(level_codes) else 0 for level_codes in codes])
+    width = offsets[-1]
+
+    def group_sums(block):
+        rows = np.arange(block.stop - block.start)
+        onehot = np.zeros((len(rows), width))
+        for level_codes, offset in zip(codes, offsets):
+            valid = level_codes[block] >= 0
+            onehot[rows[valid], offset + level_codes[block][valid]] = 1.0
+        x, m = centred[block], present[block].astype("float64")
+        return onehot.T @ m, onehot.T @ x, onehot.T @ (x * x)
+
+    eta = np.full((len(categorical), len(numerical)), np.nan)
+    if width:
+        count, sums, squares = _accumulate(_blocks(len(values), width + 3 * len(numerical)), group_sums, workers)
+        with np.errstate(all="ignore"):
+            for i, (start, stop) in enumerate(zip(offsets[:-1], offsets[1:])):
+                n, s = count[start:stop], sums[start:stop]
+                total = s.sum(axis=0) ** 2 / n.sum(axis=0)
+                between = np.where(n > 0, s ** 2 / n, 0.0).sum(axis=0) - total
+                spread = squares[start:stop].sum(axis=0) - total
+                eta[i] = np.sqrt(np.clip(between / spread, 0, 1))
+    return pd.DataFrame(eta, index=categorical, columns=numerical)
+
+
+def cramers_v(counts):
+    """
+    Cramér's V of a contingency table, from 0 (independent) to 1 (each determines the other).
+    """
+
+    counts = np.asarray(counts, dtype="float64")
+    counts = counts[counts.sum(axis=1) > 0][:, counts.sum(axis=0) > 0]
+    n = counts.sum()
+    k = min(counts.shape)
+    if k < 2:
+        return np.nan
+    expected = np.outer(counts.sum(axis=1), counts.sum(axis=0)) / n
+    chi2 = ((counts - expected) ** 2 / expected).sum()
+    return float(np.sqrt(chi2 / n / (k - 1)))
+
+
+def _long(matrix, measure):
+    long = matrix.rename_axis(index="var1", columns="var2").stack(future_stack=True).rename("value").reset_index()
+    long["measure"] = measure
+    return long[["var1", "var2", "measure", "value"]]
+
+
+@timed("associations")
+def association_matrix(df, numerical, categorical, method="pearson", cube=None, workers=None):
+    """
+    One association measure for every pair of columns.
+
+    Numerical pairs get their Pearson or Spearman correlation, categorical pairs
+    Cramér's V and mixed pairs the correlation ratio. Every measure but the correlation
+    runs from 0 to 1; the correlation also has a sign.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data.
+    numerical, categorical : list of str
+        The columns of each kind to compare.
+    method : str, optional
+        'pearson' or 'spearman', for numerical pairs.
+    cube : utils.cube.AggregateCube, optional
+        A cube over (at least) `categorical`, whose contingency tables are reused.
+        By default one is built.
+    workers : int, optional
+        Threads for the matrix products. Defaults to the CPU count.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Long frame with 'var1', 'var2', 'measure' and 'value', both orientations of every
+        pair and no self-pairs.
+    """
+
+    frames = []
+    if len(numerical) > 1:
+        frames.append(_long(correlation_matrix(df, numerical, method, workers), method.title()))
+    if numerical and categorical:
+        eta = correlation_ratios(df, categorical, numerical, workers)
+        frames += [_long(eta, "Correlation ratio"), _long(eta.T, "Correlation ratio")]
+    if len(categorical) > 1:
+        if cube is None or any((a, b) not in cube for a in categorical for b in categorical if a != b):
+            cube = build_cube(df, categorical)
+        v = np.full((len(categorical), len(categorical)), np.nan)
+        for i, j in zip(*np.triu_indices(len(categorical), 1)):
+            v[i, j] = v[j, i] = cramers_v(cube.contingency(categorical[i], categorical[j]))
+        frames.append(_long(pd.DataFrame(v, index=categorical, columns=categorical), "Cramér's V"))
+
+    if not frames:
+        return pd.DataFrame({"var1": [], "var2": [], "measure": [], "value": []})
+    long = pd.concat(frames, ignore_index=True)
+    return long[long["var1"] != long["var2"]].reset_index(drop=True)
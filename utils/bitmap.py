@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from utils.timing import stage, timed
+
+# Columns with more levels than this are not indexed; a bitmap per level would outweigh the column
+MAX_LEVELS = 50
+
+
+def _popcount(words):
+    """
+    Set bits in an array of uint64 words, counted 64 at a time (the SWAR bit-twiddling popcount).
+    """
+
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return int(((words * np.uint64(0x0101010101010101)) >> np.uint64(56)).sum())
+
+
+def _pack(mask):
+    """
+    Pack a boolean mask eight rows per byte, padded to whole uint64 words so bitmaps combine 64 rows at a time.
+    """
+
+    packed = np.packbits(mask)
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype="uint8")
+    padded[:len(packed)] = packed
+    return padded.view("uint64")
+
+
+class BitmapIndex:
+    """
+    One packed bitmap of matching rows per level of each indexed column, built once by `build_bitmap_index`.
+
+    A filter combination ORs the bitmaps of the chosen levels within each column and ANDs
+    the columns together. Every bitmap holds eight rows per byte, so a combination costs a
+    few operations over n/8 bytes instead of comparing every row again.
+
+    Filters are dicts mapping a column to the levels to keep. Columns that are not in the
+    filter, or map to no levels, are not restricted.
+    """
+
+    def __init__(self, n_rows, levels, bitmaps):
+        self.n_rows = n_rows
+        # column -> labels in index order, and column -> (levels, n_rows / 64) array of packed bitmaps
+        self._levels = levels
+        self._bitmaps = bitmaps
+        self._positions = {col: {level: i for i, level in enumerate(labels)} for col, labels in levels.items()}
+
+    @property
+    def columns(self):
+        return list(self._levels)
+
+    def levels(self, column):
+        return self._levels[column]
+
+    def bitmap(self, filters):
+        """
+        The packed bitmap of the rows matching `filters`.
+        """
+
+        result = None
+        for column, chosen in filters.items():
+            if not chosen:
+                continue
+            bitmaps = self._bitmaps[column]
+            matched = np.zeros(bitmaps.shape[1], dtype="uint64")
+            for level in chosen:
+                matched |= bitmaps[self._positions[column][level]]
+            result = matched if result is None else result & matched
+        if result is None:
+            return _pack(np.ones(self.n_rows, dtype=bool))
+        return result
+
+    def count(self, filters):
+        """
+        How many rows match `filters`, without listing them.
+        """
+
+        return _popcount(self.bitmap(filters))
+
+    def rows(self, filters):
+        """
+        The positions of the rows matching `filters`, in row order.
+        """
+
+        with stage("filter") as record:
+            rows = np.flatnonzero(np.unpackbits(self.bitmap(filters).view("uint8"), count=self.n_rows))
+            record["rows"] = len(rows)
+        return rows
+
+
+@timed("bitmap_index")
+def build_bitmap_index(df, columns, max_levels=MAX_LEVELS):
+    """
+    Index the levels of `columns` for fast filtering.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data.
+    columns : list of str
+        The categorical columns to index. Those with more than `max_levels` levels are skipped.
+    max_levels : int, optional
+        The most levels an indexed column may have.
+
+    Returns:
+    -------
+    BitmapIndex
+    """
+
+    levels, bitmaps = {}, {}
+    for col in columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, labels = series.cat.codes.to_numpy(), series.cat.categories
+        else:
+            codes, labels = pd.factorize(series, sort=True)
+        if not 0 < len(labels) <= max_levels:
+            continue
+        levels[col] = labels.tolist()
+        bitmaps[col] = np.stack([_pack(codes == i) for i in range(len(labels))])
+    return BitmapIndex(len(df), levels, bitmaps)
@@ -0,0 +1,81 @@
+import altair as alt
+
+BOX_STAT_TITLES = {"lower": "Lower Whisker", "q1": "Q1", "median": "Median", "q3": "Q3", "upper": "Upper Whisker"}
+
+
+def title_case(column):
+    return column.replace('_', ' ').title()
+
+
+def histogram_chart(bins, column):
+    """
+    Bar chart over pre-computed bins from `utils.aggregation.histogram_bins`.
+    """
+
+    return alt.Chart(bins).mark_bar(cornerRadiusTopLeft=10, cornerRadiusTopRight=10).encode(
+        alt.X("bin_start:Q", bin="binned", title=title_case(column)),
+        x2="bin_end:Q",
+        y=alt.Y("count:Q", title="Count"),
+        tooltip=[
+            alt.Tooltip("bin_start:Q", title="From"),
+            alt.Tooltip("bin_end:Q", title="To"),
+            alt.Tooltip("count:Q", title="Count")
+        ]
+    )
+
+
+def boxplot_chart(summary, outliers, value_col, group_col=None, sort_order=None, size=70):
+    """
+    Boxplot layered from a pre-computed summary from `utils.aggregation.boxplot_summary`.
+
+    Without `group_col` the box is horizontal along the x axis; with it, one vertical
+    box is drawn per group.
+    """
+
+    value_title = title_case(value_col)
+    tooltip = [alt.Tooltip(f"{stat}:Q", title=title) for stat, title in BOX_STAT_TITLES.items()]
+
+    if group_col is None:
+        value, value2 = alt.X, alt.X2
+        position = {}
+        color = alt.value('lightblue')
+    else:
+        value, value2 = alt.Y, alt.Y2
+        tooltip = [alt.Tooltip(f"{group_col}:N", title=title_case(group_col))] + tooltip
+        position = {"x": alt.X(f"{group_col}:N", title=title_case(group_col), sort=sort_order)}
+        color = alt.Color(f"{group_col}:N", scale=alt.Scale(scheme='blues'), legend=alt.Legend(title=title_case(group_col)))
+
+    base = alt.Chart(summary).encode(tooltip=tooltip, **position)
+
+    whisker = base.mark_rule().encode(value("lower:Q", title=value_title), value2("upper:Q"))
+    box = base.mark_bar(size=size).encode(value("q1:Q"), value2("q3:Q"), color=color)
+    median = base.mark_tick(size=size, color='black').encode(value("median:Q"))
+    layers = [whisker, box, median]
+
+    if len(outliers):
+        layers.append(alt.Chart(outliers).mark_point().encode(
+            value(f"{value_col}:Q"),
+            tooltip=[alt.Tooltip(f"{value_col}:Q", title=value_title), alt.Tooltip("count:Q", title="Count")],
+            **position
+        ))
+
+    return alt.layer(*layers)
+
+
+def density_scatter_chart(cells, x_col, y_col):
+    """
+    Heatmap of a binned scatter from `utils.aggregation.binned_scatter`.
+    """
+
+    return alt.Chart(cells).mark_rect().encode(
+        x=alt.X("x_start:Q", title=title_case(x_col)),
+        x2="x_end:Q",
+        y=alt.Y("y_start:Q", title=title_case(y_col)),
+        y2="y_end:Q",
+        color=alt.Color("count:Q", scale=alt.Scale(scheme='blues'), title="Count"),
+        tooltip=[
+            alt.Tooltip("x_start:Q", title=f"{title_case(x_col)} from"),
+            alt.Tooltip("y_start:Q", title=f"{title_case(y_col)} from"),
+            alt.Tooltip("count:Q", title="Count")
+        ]
+    )
@@ -0,0 +1,163 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from utils.timing import stage, timed
+
+
+def _encode(series):
+    """
+    Integer codes (-1 for missing), the labels they stand for, and a function turning
+    codes back into labels.
+
+    Categorical columns keep their dtype, so ordered bands stay ordered in every table.
+    """
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        dtype = series.dtype
+        return series.cat.codes.to_numpy(), dtype.categories, lambda codes: pd.Categorical.from_codes(codes, dtype=dtype)
+    codes, labels = pd.factorize(series, sort=True)
+    return codes, labels, lambda codes: labels[codes]
+
+
+def outcome_values(series):
+    """
+    The outcome column as 0/1 floats, whether it holds booleans or "True"/"False" strings.
+    """
+
+    if series.dtype == bool or str(series.dtype) == "boolean":
+        return series.astype("float64").to_numpy()
+    return (series.astype(str) == "True").to_numpy(dtype="float64")
+
+
+class AggregateCube:
+    """
+    Counts and outcome sums for every pair of categorical columns, computed once.
+
+    Each pair is answered by a dictionary lookup, so page reruns never scan the full frame.
+    Built by `build_cube`; cubes of different rows combine with `merge`.
+    """
+
+    def __init__(self, cells, outcome=None):
+        # (var1, var2) -> (labels_a, labels_b, decode_a, decode_b, counts, sums), one entry per unordered pair
+        self._cells = cells
+        self.outcome = outcome
+        # Tables are built on first use, since a page only looks at a few of the pairs
+        self._tables = {}
+
+    def __contains__(self, pair):
+        var1, var2 = pair
+        return (var1, var2) in self._cells or (var2, var1) in self._cells
+
+    def pair(self, var1, var2):
+        """
+        One row per observed (var1, var2) combination with 'count', 'total' (rows in the
+        var1 level), 'percentage' and, when an outcome is set, 'outcome_sum' and 'outcome_mean'.
+        """
+
+        if (var1, var2) not in self._tables:
+            if (var1, var2) in self._cells:
+                _, _, decode_a, decode_b, counts, sums = self._cells[(var1, var2)]
+                table = _pair_table(decode_a, decode_b, counts, sums, var1, var2)
+            else:
+                _, _, decode_b, decode_a, counts, sums = self._cells[(var2, var1)]
+                table = _pair_table(decode_a, decode_b, counts.T, None if sums is None else sums.T, var1, var2)
+            self._tables[(var1, var2)] = table
+        return self._tables[(var1, var2)]
+
+    def contingency(self, var1, var2):
+        """
+        The counts of every (var1, var2) combination as a matrix, one row per var1 level.
+        """
+
+        if (var1, var2) in self._cells:
+            return self._cells[(var1, var2)][4]
+        return self._cells[(var2, var1)][4].T
+
+    def claim_rate(self, index, columns):
+        """
+        Mean outcome for every (index, columns) combination, pivoted like `DataFrame.pivot_table`.
+        """
+
+        if self.outcome is None:
+            raise ValueError("This cube was built without an outcome column.")
+        table = self.pair(index, columns)
+        with stage("pivot", len(table)):
+            return table.pivot(index=index, columns=columns, values="outcome_mean")
+
+    def merge(self, other):
+        """
+        The cube of the rows of both cubes, e.g. the current one and one built from appended rows.
+
+        Counts and outcome sums are added cell by cell, so no rows are scanned again.
+
+        Raises:
+        -------
+        ValueError
+            If the cubes do not cross the same columns, with the same labels, and outcome.
+        """
+
+        if self._cells.keys() != other._cells.keys() or self.outcome != other.outcome:
+            raise ValueError("Only cubes of the same columns and outcome can be merged.")
+
+        cells = {}
+        for pair, (labels_a, labels_b, decode_a, decode_b, counts, sums) in self._cells.items():
+            other_a, other_b, _, _, other_counts, other_sums = other._cells[pair]
+            if not (labels_a.equals(other_a) and labels_b.equals(other_b)):
+                raise ValueError(f"The labels of {pair} differ between the cubes.")
+            cells[pair] = (
+                labels_a, labels_b, decode_a, decode_b, counts + other_counts, None if sums is None else sums + other_sums
+            )
+        return AggregateCube(cells, self.outcome)
+
+
+def _pair_table(decode_a, decode_b, counts, sums, var1, var2):
+    ia, ib = np.nonzero(counts)
+    table = pd.DataFrame({var1: decode_a(ia), var2: decode_b(ib), "count": counts[ia, ib]})
+    table["total"] = counts.sum(axis=1)[ia]
+    table["percentage"] = table["count"] / table["total"]
+    if sums is not None:
+        table["outcome_sum"] = sums[ia, ib]
+        table["outcome_mean"] = table["outcome_sum"] / table["count"]
+    return table
+
+
+@timed("cube")
+def build_cube(df, columns, outcome=None):
+    """
+    Precompute the aggregate cube for all pairs of `columns`.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data.
+    columns : list of str
+        The categorical columns to cross.
+    outcome : str, optional
+        A binary column whose per-cell sum and mean (e.g. the claim rate) are stored too.
+
+    Returns:
+    -------
+    AggregateCube
+    """
+
+    encoded = {col: _encode(df[col]) for col in columns}
+    y = outcome_values(df[outcome]) if outcome else None
+
+    cells = {}
+    for var1, var2 in combinations(columns, 2):
+        codes_a, labels_a, decode_a = encoded[var1]
+        codes_b, labels_b, decode_b = encoded[var2]
+        na, nb = len(labels_a), len(labels_b)
+
+        valid = (codes_a >= 0) & (codes_b >= 0)
+        key = codes_a[valid].astype("int64") * nb + codes_b[valid]
+        counts = np.bincount(key, minlength=na * nb).reshape(na, nb)
+        sums = None
+        if y is not None:
+            sums = np.bincount(key, weights=y[valid], minlength=na * nb).reshape(na, nb)
+
+        cells[(var1, var2)] = (labels_a, labels_b, decode_a, decode_b, counts, sums)
+
+    return AggregateCube(cells, outcome)
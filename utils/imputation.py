@@ -0,0 +1,104 @@
+import pandas as pd
+
+from utils.timing import timed
+
+METHODS = ("mean", "median", "mode")
+
+
+def _as_list(columns):
+    if isinstance(columns, (list, tuple)):
+        return list(columns)
+    return [columns]
+
+
+def _group_modes(df, target_col, group_cols):
+    """
+    Most frequent value of `target_col` within each group.
+
+    Ties are broken by the smallest value, matching `Series.mode()[0]`.
+    """
+
+    counts = df.groupby(group_cols + [target_col], observed=True, sort=False).size().reset_index(name="_count")
+    counts = counts.sort_values(["_count", target_col], ascending=[False, True], kind="stable")
+    return counts.drop_duplicates(group_cols).set_index(group_cols)[target_col]
+
+
+def _broadcast(stats, df, group_cols):
+    if len(group_cols) == 1:
+        keys = df[group_cols[0]]
+    else:
+        keys = pd.MultiIndex.from_frame(df[group_cols])
+    return pd.Series(stats.reindex(keys).to_numpy(), index=df.index)
+
+
+@timed("impute")
+def input_missing_values(df, target_col, group_col, method="mean"):
+    """
+    Input missing values in a DataFrame based on group-specific statistics.
+
+    This function fills missing values in the specified target column(s) by calculating
+    a statistic (mean, median, or mode) within each group of the specified grouping column(s).
+    All group statistics are computed in one groupby pass instead of one mask per group,
+    so the cost is linear in the number of rows regardless of how many groups there are.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data. It is modified in place.
+    target_col : str or list of str
+        The name(s) of the column(s) with missing values to be filled.
+    group_col : str or list of str
+        The name(s) of the column(s) used to group data before calculating the statistic.
+    method : str, optional
+        The method to fill missing values. Options are 'mean', 'median', or 'mode'.
+
+    Raises:
+    -------
+    ValueError
+        If an invalid method is provided (i.e., not 'mean', 'median' or 'mode').
+    """
+
+    if method not in METHODS:
+        raise ValueError("Invalid method. Choose 'mean', 'median' or 'mode'.")
+
+    groups = _as_list(group_col)
+    targets = [col for col in _as_list(target_col) if df[col].isna().any()]
+    if not targets:
+        return
+
+    if method == "mode":
+        for col in targets:
+            fill = _broadcast(_group_modes(df, col, groups), df, groups)
+            df[col] = df[col].fillna(fill)
+        return
+
+    fill = df.groupby(groups, observed=True, sort=False)[targets].transform(method)
+    for col in targets:
+        df[col] = df[col].fillna(fill[col])
+
+
+def fill_from_statistics(df, target_col, group_col, statistics):
+    """
+    Fill missing values of `target_col` from precomputed per-group values.
+
+    Used when the statistics cannot come from `df` itself, e.g. when the data is
+    processed chunk by chunk and the values were estimated over the whole file.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame containing the data. It is modified in place.
+    target_col : str
+        The column with missing values to be filled.
+    group_col : str or list of str
+        The column(s) used as the group key.
+    statistics : pandas.Series
+        Replacement values indexed by the group key.
+    """
+
+    if not df[target_col].isna().any():
+        return
+
+    # The statistics are float64; filling with them as they are would upcast e.g. float32 columns
+    fill = _broadcast(statistics, df, _as_list(group_col)).astype(df[target_col].dtype)
+    df[target_col] = df[target_col].fillna(fill)
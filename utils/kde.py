@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+from utils.timing import timed
+
+BANDWIDTH_METHODS = ("scott", "silverman")
+
+
+def bandwidth(values, method="scott"):
+    """
+    Gaussian kernel bandwidth from a rule of thumb.
+
+    Parameters:
+    ----------
+    values : numpy.ndarray
+        Finite sample values.
+    method : str, optional
+        'scott' (1.06 * std * n^-1/5) or 'silverman' (0.9 * min(std, IQR / 1.34) * n^-1/5).
+
+    Returns:
+    -------
+    float
+
+    Raises:
+    -------
+    ValueError
+        If an unknown method is given.
+    """
+
+    n = len(values)
+    std = np.std(values, ddof=1) if n > 1 else 0.0
+    iqr = np.subtract(*np.percentile(values, [75, 25])) if method == "silverman" and n else 0.0
+    return rule_bandwidth(std, iqr, n, method)
+
+
+def rule_bandwidth(std, iqr, n, method="scott"):
+    """
+    The rule-of-thumb bandwidth of `bandwidth`, from the summary statistics it needs.
+    """
+
+    if method not in BANDWIDTH_METHODS:
+        raise ValueError("Invalid bandwidth method. Choose 'scott' or 'silverman'.")
+
+    if method == "scott":
+        spread, factor = std, 1.06
+    else:
+        spread = min(std, iqr / 1.34) or std
+        factor = 0.9
+
+    h = factor * spread * n ** (-1 / 5) if n else 0.0
+    # Constant columns still need a positive width
+    return h if h > 0 else 1.0
+
+
+def linear_binning(values, lo, delta, grid_size, weights=None):
+    """
+    Spread each value (or its weight) over its two neighbouring grid points in proportion to its distance.
+    """
+
+    weights = 1.0 if weights is None else weights
+    position = (values - lo) / delta
+    left = np.clip(np.floor(position).astype("int64"), 0, grid_size - 2)
+    frac = position - left
+    counts = np.bincount(left, weights=(1 - frac) * weights, minlength=grid_size)
+    counts += np.bincount(left + 1, weights=frac * weights, minlength=grid_size)
+    return counts
+
+
+def binned_kde(values, grid_size=512, bw_method="scott", cut=3, grid=None, bw=None, weights=None):
+    """
+    Gaussian kernel density estimate via linear binning and an FFT convolution.
+
+    The sample is first binned onto a regular grid in O(n); the kernel is then applied
+    to the binned counts with an FFT in O(grid_size log grid_size), so the cost no
+    longer grows with n times the number of evaluation points.
+
+    Parameters:
+    ----------
+    values : array-like
+        Sample values; NaNs are ignored.
+    grid_size : int, optional
+        Number of evaluation points.
+    bw_method : str, optional
+        Bandwidth rule, 'scott' or 'silverman'. Ignored when `bw` is given.
+    cut : float, optional
+        How many bandwidths the grid extends past the data range.
+    grid : numpy.ndarray, optional
+        Regular grid to evaluate on instead of deriving one from the data.
+    bw : float, optional
+        Explicit bandwidth.
+    weights : array-like, optional
+        How many observations each value stands for, e.g. the weights of sketch centroids.
+        The bandwidth rules ignore them, so pass `bw` as well.
+
+    Returns:
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray)
+        The grid and the estimated density on it.
+    """
+
+    values = np.asarray(values, dtype="float64")
+    weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype="float64")
+    finite = np.isfinite(values)
+    values, weights = values[finite], weights[finite]
+    if bw is None:
+        bw = bandwidth(values, bw_method) if len(values) else 1.0
+
+    if grid is None:
+        lo, hi = (values.min(), values.max()) if len(values) else (0.0, 0.0)
+        grid = np.linspace(lo - cut * bw, hi + cut * bw, grid_size)
+    if len(values) == 0:
+        return grid, np.zeros_like(grid)
+
+    grid_size = len(grid)
+    delta = grid[1] - grid[0]
+    counts = linear_binning(values, grid[0], delta, grid_size, weights)
+
+    # Kernel sampled at grid offsets, truncated where it is numerically zero
+    half_width = min(grid_size - 1, int(np.ceil(4 * bw / delta)))
+    offsets = np.arange(-half_width, half_width + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / bw) ** 2) / (bw * np.sqrt(2 * np.pi))
+
+    size = grid_size + len(kernel) - 1
+    fft_size = 1 << (size - 1).bit_length()
+    smoothed = np.fft.irfft(np.fft.rfft(counts, fft_size) * np.fft.rfft(kernel, fft_size), fft_size)
+    density = smoothed[half_width:half_width + grid_size] / weights.sum()
+    return grid, np.clip(density, 0, None)
+
+
+@timed("kde")
+def kde_frame(series, grid_size=512, bw_method="scott"):
+    """
+    Kernel density estimate of a column as a plot-ready frame.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Columns named after the series and 'density'.
+    """
+
+    grid, density = binned_kde(series.to_numpy(dtype="float64", na_value=np.nan), grid_size, bw_method)
+    return pd.DataFrame({series.name: grid, "density": density})
+
+
+@timed("kde")
+def grouped_kde(df, value_col, group_col, grid_size=512, bw_method="scott"):
+    """
+    One kernel density estimate per level of `group_col`, evaluated on a shared grid.
+
+    Each group's bandwidth comes from its own sample, so small groups are not over-smoothed
+    by the spread of the whole column.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Long frame with `value_col`, 'density' and `group_col` columns.
+    """
+
+    values = df[value_col].to_numpy(dtype="float64", na_value=np.nan)
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return pd.DataFrame({value_col: [], "density": [], group_col: []})
+
+    cut = 3 * bandwidth(finite, bw_method)
+    grid = np.linspace(finite.min() - cut, finite.max() + cut, grid_size)
+
+    frames = []
+    for level, group in df.groupby(group_col, observed=True)[value_col]:
+        _, density = binned_kde(group.to_numpy(dtype="float64", na_value=np.nan), grid=grid, bw_method=bw_method)
+        frames.append(pd.DataFrame({value_col: grid, "density": density, group_col: level}))
+    return pd.concat(frames, ignore_index=True)
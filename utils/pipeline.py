@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+import pandas as pd
+
+from utils.imputation import fill_from_statistics, input_missing_values
+from utils.storage import SCHEMA_VERSION
+from utils.timing import timed
+
+# Bump whenever `preprocess` changes behaviour so stale cache entries are not reused
+PIPELINE_VERSION = 2
+
+BOOL_STR_DTYPE = pd.CategoricalDtype(["False", "True"])
+
+CUSTOMER_DATA = "datasets/customer-data.csv"
+
+CUSTOMER_PIPELINE = {
+    "drop": ["id", "DUIs"],
+    "impute": [
+        {"target": "credit_score", "group": "income", "method": "mean"},
+        {"target": "annual_mileage", "group": "driving_experience", "method": "mean"},
+    ],
+    "bool_to_str": True,
+}
+
+
+def config_key(config):
+    """
+    Stable key for a pipeline config, including the pipeline version.
+    """
+
+    payload = json.dumps({"version": PIPELINE_VERSION, "schema": SCHEMA_VERSION, "config": config}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+@timed("preprocess")
+def preprocess(df, config, statistics=None):
+    """
+    Apply the cleaning steps described by `config` and return a ready-to-plot frame.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The raw data, as read from disk.
+    config : dict
+        Pipeline description with optional 'drop', 'impute' and 'bool_to_str' entries.
+    statistics : dict, optional
+        Per-group fill values keyed by (target, group, method), for when `df` is only a
+        chunk of the data. By default the statistics are computed from `df`.
+
+    Returns:
+    -------
+    pandas.DataFrame
+    """
+
+    df = df.drop(config.get("drop", []), axis=1)
+
+    for step in config.get("impute", []):
+        method = step.get("method", "mean")
+        if statistics is None:
+            input_missing_values(df, target_col=step["target"], group_col=step["group"], method=method)
+        else:
+            fill_from_statistics(df, step["target"], step["group"], statistics[(step["target"], step["group"], method)])
+
+    if config.get("bool_to_str"):
+        for col in df.select_dtypes(include="bool").columns:
+            df[col] = df[col].map({True: "True", False: "False"}).astype(BOOL_STR_DTYPE)
+
+    return df
@@ -0,0 +1,200 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from utils.aggregation import histogram_bins
+from utils.timing import timed
+
+QUANTILES = [0.25, 0.5, 0.75]
+TOP_VALUES = 50
+# Below this many rows, starting worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 200_000
+
+
+def profile_column(series, top=TOP_VALUES):
+    """
+    Summary statistics for one column.
+
+    Parameters:
+    ----------
+    series : pandas.Series
+        The column to profile.
+    top : int, optional
+        How many of the most frequent values to keep for high-cardinality columns.
+
+    Returns:
+    -------
+    dict
+        'kind', 'count', 'missing', 'cardinality' and 'value_counts' for every column,
+        plus 'describe' and 'histogram' for numeric ones.
+    """
+
+    counts = series.value_counts()
+    numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    profile = {
+        "kind": "numerical" if numeric else "categorical",
+        "count": int(series.count()),
+        "missing": int(series.isna().sum()),
+        "cardinality": int((counts > 0).sum()),
+        # Categorical columns keep every level for bar charts; numeric ones only the most frequent
+        "value_counts": counts.head(top) if numeric else counts,
+    }
+
+    if numeric:
+        profile["describe"] = series.describe(percentiles=QUANTILES)
+        profile["histogram"] = histogram_bins(series)
+    return profile
+
+
+def _profile_chunk(frame):
+    return {col: profile_column(frame[col]) for col in frame.columns}
+
+
+class DataFrameProfile:
+    """
+    Per-column profiles for a whole DataFrame, built by `profile_dataframe`.
+    """
+
+    def __init__(self, columns, n_rows):
+        self.columns = columns
+        self.n_rows = n_rows
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def value_counts(self, column):
+        """
+        Value counts as a two-column frame (`column`, 'count'), most frequent first.
+        """
+
+        counts = self.columns[column]["value_counts"].reset_index()
+        counts.columns = [column, "count"]
+        return counts
+
+    def describe(self, column):
+        """
+        The same one-row table as `df[[column]].describe().T`.
+        """
+
+        return self.columns[column]["describe"].to_frame(column).T
+
+    def histogram(self, column):
+        return self.columns[column]["histogram"]
+
+    def summary(self, kind=None):
+        """
+        One row per column with its kind, missingness, cardinality and headline statistics.
+
+        Parameters:
+        ----------
+        kind : str, optional
+            Only include 'categorical' or 'numerical' columns.
+        """
+
+        rows = []
+        for column, profile in self.columns.items():
+            if kind and profile["kind"] != kind:
+                continue
+            counts = profile["value_counts"]
+            row = {
+                "column": column,
+                "kind": profile["kind"],
+                "missing": profile["missing"],
+                "missing_pct": profile["missing"] / self.n_rows if self.n_rows else 0.0,
+                "cardinality": profile["cardinality"],
+                "top_value": counts.index[0] if len(counts) else None,
+                "top_count": int(counts.iloc[0]) if len(counts) else 0,
+            }
+            if "describe" in profile:
+                row.update({stat: profile["describe"][stat] for stat in ["mean", "std", "min", "50%", "max"]})
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("column")
+
+
+@timed("profile")
+def profile_dataframe(df, workers=None, parallel=True, min_rows=PARALLEL_MIN_ROWS):
+    """
+    Profile every column of `df`, spreading column chunks across a process pool.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        The DataFrame to profile.
+    workers : int, optional
+        Number of worker processes. Defaults to the CPU count, capped at the number of columns.
+    parallel : bool, optional
+        Set to False to always profile in the current process.
+    min_rows : int, optional
+        Frames with fewer rows are profiled in the current process.
+
+    Returns:
+    -------
+    DataFrameProfile
+    """
+
+    columns = df.columns.tolist()
+    workers = min(workers or os.cpu_count() or 1, len(columns))
+
+    if not parallel or workers <= 1 or len(df) < min_rows:
+        return DataFrameProfile(_profile_chunk(df), len(df))
+
+    # One chunk of columns per worker keeps pickling to a single frame each; dealing the
+    # columns round-robin spreads expensive neighbouring columns across workers
+    chunks = [columns[i::workers] for i in range(workers)]
+    # Forking the threaded Streamlit server can copy a lock another thread holds, so the
+    # workers start from a fresh interpreter instead
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        results = executor.map(_profile_chunk, [df[chunk] for chunk in chunks])
+        profiles = {}
+        for result in results:
+            profiles.update(result)
+
+    return DataFrameProfile({col: profiles[col] for col in columns}, len(df))
+
+
+def _merge_counts(profile, appended):
+    counts = profile["value_counts"].add(appended["value_counts"], fill_value=0).astype("int64")
+    counts = counts.sort_values(ascending=False, kind="stable")
+    return {
+        "kind": profile["kind"],
+        "count": profile["count"] + appended["count"],
+        "missing": profile["missing"] + appended["missing"],
+        "cardinality": int((counts > 0).sum()),
+        "value_counts": counts,
+    }
+
+
+@timed("profile")
+def update_profile(profile, df, start):
+    """
+    Profile `df` from the profile of its first `start` rows, e.g. after rows were appended.
+
+    Categorical columns only count the new rows and add them to their value counts.
+    Numerical ones are profiled again: their quantiles cannot be combined, and their
+    earlier values may have changed with the imputed means.
+
+    Parameters:
+    ----------
+    profile : DataFrameProfile
+        The profile of `df.iloc[:start]`, with the same columns.
+    df : pandas.DataFrame
+        All the rows.
+    start : int
+        The first new row.
+
+    Returns:
+    -------
+    DataFrameProfile
+    """
+
+    appended = df.iloc[start:]
+    columns = {}
+    for column, previous in profile.columns.items():
+        if previous["kind"] == "categorical":
+            columns[column] = _merge_counts(previous, profile_column(appended[column]))
+        else:
+            columns[column] = profile_column(df[column])
+    return DataFrameProfile(columns, len(df))
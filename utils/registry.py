@@ -0,0 +1,291 @@
+import glob
+import json
+import os
+import re
+
+import pandas as pd
+
+from utils.pipeline import CUSTOMER_DATA, CUSTOMER_PIPELINE
+from utils.storage import CUSTOMER_SCHEMA, SCHEMAS, cache_path, csv_options, file_fingerprint
+
+DATASETS_DIR = "datasets"
+
+# Bump whenever inference changes so cached schemas are inferred again
+INFERENCE_VERSION = 3
+# String columns with more distinct values are free text rather than categories
+MAX_LEVELS = 50
+# Integer columns with at most this many distinct values are categorical codes
+MAX_CODES = 12
+# Boolean columns with one of these names are taken as the target
+TARGET_NAMES = ("outcome", "target", "label", "class", "survived", "y")
+
+# Levels such as "16-25", "65+" or "0-9y" are ordered by their leading number
+_LEADING_NUMBER = re.compile(r"\s*[<>]?\s*(\d+(?:\.\d+)?)")
+
+
+class Dataset:
+    """
+    How to read, clean and present one file.
+
+    Parameters:
+    ----------
+    path : str
+        The source CSV.
+    schema : dict
+        Column dtypes passed to `pandas.read_csv`. Ordered categoricals define the sort order of their column.
+    pipeline : dict
+        Config for `utils.pipeline.preprocess`.
+    target : str, optional
+        A boolean column whose rate the bivariate and multivariate views summarise.
+    target_label : str, optional
+        How to call the target's rate in titles. Defaults to "<Target> Rate".
+    defaults : dict, optional
+        Default column (or pair of columns for 'bivariate' and 'multivariate') per page.
+    value_labels : dict, optional
+        Display labels for the values of a column, e.g. {"married": {"True": "Married"}}.
+    titles : dict, optional
+        Display titles for columns whose title-cased name does not read well.
+    """
+
+    def __init__(self, path, schema, pipeline, target=None, target_label=None, defaults=None, value_labels=None,
+                 titles=None):
+        self.path = path
+        self.schema = schema
+        self.pipeline = pipeline
+        self.target = target
+        self.target_label = target_label or (f"{target.replace('_', ' ').title()} Rate" if target else None)
+        self.defaults = defaults or {}
+        self.value_labels = value_labels or {}
+        self.titles = titles or {}
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def title(self, column):
+        return self.titles.get(column, column.replace("_", " ").title())
+
+    def sort_order(self, column):
+        """
+        The levels of an ordinal column in order, or None if the column has no natural order.
+        """
+
+        dtype = self.schema.get(column)
+        if isinstance(dtype, pd.CategoricalDtype) and dtype.ordered:
+            return dtype.categories.tolist()
+        return None
+
+    def default(self, page, columns):
+        """
+        The default selection of `page` among `columns`, falling back to the first ones.
+
+        Without an explicit default, the bivariate page pairs the first column with the target.
+        """
+
+        default = self.defaults.get(page)
+        if page in ("bivariate", "multivariate"):
+            if default and all(col in columns for col in default):
+                return list(default)
+            others = [col for col in columns if col != self.target]
+            if page == "bivariate" and self.target in columns and others:
+                return [others[0], self.target]
+            return columns[:2]
+        return default if default in columns else (columns[0] if columns else None)
+
+
+CUSTOMER = Dataset(
+    CUSTOMER_DATA,
+    CUSTOMER_SCHEMA,
+    CUSTOMER_PIPELINE,
+    target="outcome",
+    target_label="Claim Rate",
+    defaults={
+        "categorical": "education",
+        "numerical": "annual_mileage",
+        "bivariate": ["education", "outcome"],
+        "multivariate": ["driving_experience", "married"],
+    },
+    value_labels={"married": {"False": "Not Married", "True": "Married"}},
+    titles={"married": "Marital Status"},
+)
+
+# Hand-written entries; every other file in `DATASETS_DIR` is inferred by `infer_dataset`
+REGISTRY = {
+    CUSTOMER.name: CUSTOMER,
+}
+
+_inferred = {}
+
+
+def _ordinal_levels(levels):
+    numbers = [_LEADING_NUMBER.match(str(level)) for level in levels]
+    if len(levels) < 2 or not all(numbers):
+        return None
+    return [level for _, level in sorted(zip((float(match.group(1)) for match in numbers), levels))]
+
+
+def _infer_column(series):
+    """
+    The read dtype of one column, as parsed by pandas without a schema.
+    """
+
+    values = series.dropna()
+    unique = values.unique()
+
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_numeric_dtype(series):
+        if len(unique) and set(unique) <= {0, 1}:
+            return "boolean"
+        integral = (values == values.round()).all()
+        # Levels are matched against the text of the file, so codes written "1.0" (or with
+        # blanks, which pandas parses as float) stay numeric rather than becoming level "1"
+        if integral and len(unique) <= MAX_CODES and pd.api.types.is_integer_dtype(series):
+            return pd.CategoricalDtype(sorted(unique.astype("int64").tolist()), ordered=True)
+        if integral and len(values) == len(series):
+            # int32 at the smallest, so arithmetic on the column does not overflow
+            return "int32" if values.min() >= -2**31 and values.max() < 2**31 else "int64"
+        return "float64"
+    if len(unique) <= MAX_LEVELS:
+        ordinal = _ordinal_levels(unique.tolist())
+        return pd.CategoricalDtype(ordinal or sorted(unique.tolist()), ordered=ordinal is not None)
+    return "string"
+
+
+def _is_identifier(name, series):
+    lowered = name.lower()
+    named = lowered == "id" or lowered.endswith("id") or lowered.startswith("unnamed")
+    return named and pd.api.types.is_integer_dtype(series) and series.is_unique
+
+
+def infer_dataset(path):
+    """
+    Infer a `Dataset` from the contents of a CSV.
+
+    Integer columns with few distinct values become ordered categoricals, 0/1 columns
+    booleans, and string columns with few levels categoricals, ordered when every level
+    starts with a number. Identifier columns are dropped and missing numbers are filled
+    with their mean within the smallest categorical column. A file whose first line holds
+    only numbers has no header, and its columns are named by `utils.storage.header_names`.
+
+    Parameters:
+    ----------
+    path : str
+        The source CSV.
+
+    Returns:
+    -------
+    Dataset
+    """
+
+    df = pd.read_csv(path, **csv_options(path))
+    schema = {col: _infer_column(df[col]) for col in df.columns}
+
+    booleans = [col for col, dtype in schema.items() if dtype == "boolean"]
+    targets = [col for col in booleans if col.lower() in TARGET_NAMES]
+    target = targets[-1] if targets else None
+
+    drop = [col for col in df.columns if _is_identifier(col, df[col])]
+    groups = [
+        col for col, dtype in schema.items()
+        if col != target and col not in drop and (dtype == "boolean" or isinstance(dtype, pd.CategoricalDtype))
+    ]
+    group = min(groups, key=lambda col: df[col].nunique(), default=None)
+    missing = [
+        col for col, dtype in schema.items()
+        if dtype == "float64" and col not in drop and df[col].isna().any()
+    ]
+
+    pipeline = {
+        "drop": drop,
+        "impute": [{"target": col, "group": group, "method": "mean"} for col in missing] if group else [],
+        "bool_to_str": True,
+    }
+    return Dataset(path, schema, pipeline, target=target)
+
+
+def _encode_dtype(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {"categories": dtype.categories.tolist(), "ordered": bool(dtype.ordered)}
+    return dtype
+
+
+def _decode_dtype(spec):
+    if isinstance(spec, dict):
+        return pd.CategoricalDtype(spec["categories"], ordered=spec["ordered"])
+    return spec
+
+
+def _schema_path(path):
+    return cache_path(path, ".schema.json")
+
+
+def _read_cached(path, tag):
+    dest = _schema_path(path)
+    if not os.path.exists(dest):
+        return None
+    with open(dest) as f:
+        cached = json.load(f)
+    if cached.get("source") != tag:
+        return None
+    schema = {col: _decode_dtype(spec) for col, spec in cached["schema"].items()}
+    return Dataset(path, schema, cached["pipeline"], target=cached["target"])
+
+
+def _write_cached(dataset, tag):
+    dest = _schema_path(dataset.path)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    cached = {
+        "source": tag,
+        "schema": {col: _encode_dtype(dtype) for col, dtype in dataset.schema.items()},
+        "pipeline": dataset.pipeline,
+        "target": dataset.target,
+    }
+    with open(dest, "w") as f:
+        json.dump(cached, f, indent=2)
+
+
+def get_dataset(path):
+    """
+    The `Dataset` for `path`: its registry entry, or a schema inferred once per version of the file.
+
+    Inferred schemas are kept in memory and next to the columnar copies, so inference
+    only reruns when the file changes. They are also added to `utils.storage.SCHEMAS` by
+    absolute path, so every reader of the file uses the same dtypes.
+
+    Returns:
+    -------
+    Dataset
+    """
+
+    name = os.path.basename(path)
+    if name in REGISTRY:
+        return REGISTRY[name]
+
+    tag = f"{file_fingerprint(path)}-v{INFERENCE_VERSION}"
+    source = os.path.abspath(path)
+    key = (source, tag)
+    if key not in _inferred:
+        dataset = _read_cached(path, tag)
+        if dataset is None:
+            dataset = infer_dataset(path)
+            _write_cached(dataset, tag)
+        _inferred[key] = dataset
+    dataset = _inferred[key]
+    SCHEMAS[source] = dataset.schema
+    return dataset
+
+
+def list_datasets(directory=DATASETS_DIR):
+    """
+    Every CSV directly inside `directory`, registered datasets first.
+
+    Returns:
+    -------
+    list of str
+    """
+
+    return sorted(
+        glob.glob(os.path.join(directory, "*.csv")),
+        key=lambda path: (os.path.basename(path) not in REGISTRY, path.lower())
+    )
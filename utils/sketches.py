@@ -0,0 +1,519 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.aggregation import nice_bin_edges
+from utils.imputation import METHODS
+from utils.kde import binned_kde, rule_bandwidth
+from utils.pipeline import preprocess
+from utils.storage import apply_levels, csv_options, parse_dtypes, schema_for
+from utils.timing import stage
+
+CHUNKSIZE = 100_000
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (a merging t-digest).
+
+    Values are summarised by at most about `compression` weighted centroids, kept small
+    near the tails so extreme quantiles stay accurate. Count, sum, min and max are exact.
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        # arcsin scale function: one unit of k covers fewer points near q=0 and q=1
+        cluster = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)).astype("int64")
+        merged_weights = np.bincount(cluster, weights=weights)
+        keep = merged_weights > 0
+        self.means = np.bincount(cluster, weights=weights * means)[keep] / merged_weights[keep]
+        self.weights = merged_weights[keep]
+
+    def update(self, values, weights=None):
+        """
+        Add `values`, each seen `weights` times (once by default).
+        """
+
+        values = np.asarray(values, dtype="float64")
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype="float64")
+        keep = np.isfinite(values) & (weights > 0)
+        values, weights = values[keep], weights[keep]
+        if len(values) == 0:
+            return self
+
+        self.count += int(weights.sum())
+        self.total += (values * weights).sum()
+        self.total_sq += (np.square(values) * weights).sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _positions(self):
+        cumulative = np.cumsum(self.weights)
+        mid = (cumulative - self.weights / 2) / cumulative[-1]
+        return np.concatenate([[0.0], mid, [1.0]]), np.concatenate([[self.min], self.means, [self.max]])
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        positions, values = self._positions()
+        return np.interp(q, positions, values)
+
+    def cdf(self, x):
+        if self.count == 0:
+            return np.zeros(np.shape(x)) if np.ndim(x) else 0.0
+        positions, values = self._positions()
+        return np.interp(x, values, positions, left=0.0, right=1.0)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return np.nan
+        variance = (self.total_sq - self.total ** 2 / self.count) / (self.count - 1)
+        return np.sqrt(max(variance, 0.0))
+
+
+class CountMinSketch:
+    """
+    Mergeable frequency sketch; estimates never undercount and overcount by at most
+    about e / width of the total with high probability.
+    """
+
+    def __init__(self, width=2048, depth=5, seed=0):
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self.multipliers = rng.integers(1, 2 ** 63, depth, dtype="uint64") | np.uint64(1)
+        self.offsets = rng.integers(0, 2 ** 63, depth, dtype="uint64")
+        self.table = np.zeros((depth, width), dtype="int64")
+
+    def _buckets(self, keys):
+        hashed = pd.util.hash_array(np.asarray(keys, dtype=object))
+        with np.errstate(over="ignore"):
+            mixed = hashed[None, :] * self.multipliers[:, None] + self.offsets[:, None]
+        return ((mixed >> np.uint64(32)) % np.uint64(self.width)).astype("int64")
+
+    def add(self, counts):
+        """
+        Add a `pandas.Series` of counts indexed by value.
+        """
+
+        buckets = self._buckets(counts.index)
+        for row, columns in zip(self.table, buckets):
+            np.add.at(row, columns, counts.to_numpy())
+        return self
+
+    def estimate(self, keys):
+        buckets = self._buckets(keys)
+        return self.table[np.arange(len(self.table))[:, None], buckets].min(axis=0)
+
+    def merge(self, other):
+        self.table += other.table
+        return self
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary keeping at most `capacity` candidate frequent values.
+
+    While fewer than `capacity` distinct values have been seen the counts are exact.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="int64")
+        self.exact = True
+
+    def add(self, counts):
+        counts = counts[counts > 0]
+        combined = self.counts.add(counts, fill_value=0) if len(self.counts) else counts
+        if len(combined) > self.capacity:
+            threshold = combined.nlargest(self.capacity + 1).iloc[-1]
+            combined = combined[combined > threshold] - threshold
+            self.exact = False
+        self.counts = combined.astype("int64")
+        return self
+
+    def merge(self, other):
+        self.exact = self.exact and other.exact
+        return self.add(other.counts)
+
+    def top(self, n=None):
+        top = self.counts.sort_values(ascending=False, kind="stable")
+        return top if n is None else top.head(n)
+
+
+class CategoricalSketch:
+    """
+    Value counts for one column: heavy hitters name the frequent values and a count-min
+    sketch estimates their counts once the summary is no longer exact.
+    """
+
+    def __init__(self, capacity=256):
+        self.heavy_hitters = HeavyHitters(capacity)
+        self.count_min = CountMinSketch()
+        self.count = 0
+
+    def update(self, series):
+        return self.add(series.value_counts(dropna=True))
+
+    def add(self, counts):
+        """
+        Add a `pandas.Series` of counts indexed by value.
+        """
+
+        counts = counts[counts > 0]
+        counts.index = counts.index.astype(object)
+        self.count += int(counts.sum())
+        self.heavy_hitters.add(counts)
+        self.count_min.add(counts)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.count_min.merge(other.count_min)
+        return self
+
+    def value_counts(self):
+        top = self.heavy_hitters.top()
+        if not self.heavy_hitters.exact:
+            top = pd.Series(self.count_min.estimate(top.index), index=top.index).sort_values(ascending=False, kind="stable")
+        return top
+
+
+def stream_chunks(path, columns=None, chunksize=CHUNKSIZE):
+    """
+    Yield a file as DataFrame chunks without loading it whole.
+
+    Feather files are read record batch by record batch from a memory map; anything
+    else is read as CSV with the file's explicit schema, if it has one.
+    """
+
+    if os.path.splitext(path)[1] in (".feather", ".arrow"):
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                yield batch.to_pandas()
+        return
+
+    schema = schema_for(path)
+    for chunk in pd.read_csv(path, usecols=columns, dtype=parse_dtypes(schema), chunksize=chunksize, **csv_options(path)):
+        yield apply_levels(chunk, schema, path)
+
+
+class GroupSketch:
+    """
+    Streaming per-group statistic of one target column, for imputation.
+    """
+
+    def __init__(self, target_col, group_col, method):
+        if method not in METHODS:
+            raise ValueError("Invalid method. Choose 'mean', 'median' or 'mode'.")
+        self.target_col = target_col
+        self.group_col = group_col
+        self.method = method
+        self.sums = pd.Series(dtype="float64")
+        self.counts = pd.Series(dtype="int64")
+        self.sketches = {}
+
+    def update(self, chunk):
+        data = chunk[[self.group_col, self.target_col]].dropna()
+        if self.method == "mean":
+            grouped = data.groupby(self.group_col, observed=True)[self.target_col].agg(["sum", "count"])
+            self.sums = self.sums.add(grouped["sum"], fill_value=0)
+            self.counts = self.counts.add(grouped["count"], fill_value=0)
+        elif self.method == "median":
+            for group, values in data.groupby(self.group_col, observed=True)[self.target_col]:
+                self.sketches.setdefault(group, TDigest()).update(values.to_numpy())
+        else:
+            for group, values in data.groupby(self.group_col, observed=True)[self.target_col]:
+                self.sketches.setdefault(group, HeavyHitters()).add(values.value_counts())
+        return self
+
+    def values(self):
+        """
+        The statistic per group, as a Series indexed by group.
+        """
+
+        if self.method == "mean":
+            return self.sums / self.counts
+        if self.method == "median":
+            return pd.Series({group: digest.quantile(0.5) for group, digest in self.sketches.items()})
+        # Ties broken by the smallest value, like `Series.mode()[0]`
+        return pd.Series({
+            group: min(top.index[top == top.max()]) for group, top in ((g, hh.top()) for g, hh in self.sketches.items())
+        })
+
+
+class StreamingProfile:
+    """
+    Approximate column statistics gathered in one pass over a file, in bounded memory.
+
+    Numeric columns are summarised by a `TDigest` and the rest by a `CategoricalSketch`.
+    The accessors mirror `utils.profiling.DataFrameProfile`, so pages can read either.
+    """
+
+    def __init__(self):
+        self.numeric = {}
+        self.categorical = {}
+        self.missing = {}
+        self.n_rows = 0
+
+    def update(self, chunk):
+        self.n_rows += len(chunk)
+        for col in chunk.columns:
+            series = chunk[col]
+            self.missing[col] = self.missing.get(col, 0) + int(series.isna().sum())
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                self.numeric.setdefault(col, TDigest()).update(series.to_numpy(dtype="float64", na_value=np.nan))
+            else:
+                self.categorical.setdefault(col, CategoricalSketch()).update(series)
+        return self
+
+    def fill(self, column, counts):
+        """
+        Count values that fill in missing entries of `column`, given as a `pandas.Series`
+        of counts indexed by the fill value.
+        """
+
+        counts = counts[counts > 0]
+        if column in self.numeric:
+            self.numeric[column].update(counts.index.to_numpy(dtype="float64"), counts.to_numpy())
+        else:
+            self.categorical.setdefault(column, CategoricalSketch()).add(counts)
+        self.missing[column] -= int(counts.sum())
+        return self
+
+    def value_counts(self, column):
+        counts = self.categorical[column].value_counts().reset_index()
+        counts.columns = [column, "count"]
+        return counts
+
+    def quantile(self, column, q):
+        return self.numeric[column].quantile(q)
+
+    def median(self, column):
+        return self.quantile(column, 0.5)
+
+    def mode(self, column):
+        top = self.categorical[column].value_counts()
+        return top.index[0] if len(top) else None
+
+    def describe(self, column):
+        """
+        Approximate equivalent of `df[[column]].describe().T`.
+        """
+
+        digest = self.numeric[column]
+        q1, q2, q3 = digest.quantile([0.25, 0.5, 0.75])
+        stats = {
+            "count": float(digest.count), "mean": digest.mean, "std": digest.std, "min": digest.min,
+            "25%": q1, "50%": q2, "75%": q3, "max": digest.max,
+        }
+        return pd.DataFrame(stats, index=[column])
+
+    def histogram(self, column, maxbins=30):
+        """
+        Histogram bins estimated from the digest's CDF, in the format of `histogram_bins`.
+        """
+
+        digest = self.numeric[column]
+        if digest.count == 0:
+            return pd.DataFrame({"bin_start": [], "bin_end": [], "count": []})
+        edges = nice_bin_edges([digest.min, digest.max], maxbins)
+        cdf = digest.cdf(edges)
+        cdf[-1] = 1.0
+        counts = np.round(np.diff(cdf) * digest.count).astype("int64")
+        return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+    def kde(self, column, bw_method="scott", grid_size=512):
+        """
+        Kernel density estimate in the format of `kde_frame`, smoothing the digest's
+        centroids by their weights. The bandwidth rules use the sketched std and IQR.
+        """
+
+        digest = self.numeric[column]
+        if digest.count == 0:
+            return pd.DataFrame({column: [], "density": []})
+        q1, q3 = digest.quantile([0.25, 0.75])
+        bw = rule_bandwidth(0.0 if np.isnan(digest.std) else digest.std, q3 - q1, digest.count, bw_method)
+        grid = np.linspace(digest.min - 3 * bw, digest.max + 3 * bw, grid_size)
+        _, density = binned_kde(digest.means, grid=grid, bw=bw, weights=digest.weights)
+        return pd.DataFrame({column: grid, "density": density})
+
+    def boxplot(self, column):
+        """
+        Boxplot summary in the format of `boxplot_summary`.
+
+        Whiskers are the 1.5 IQR fences clipped to the observed range, and individual
+        outliers are not available from the sketch, so the outlier frame is empty.
+        """
+
+        digest = self.numeric[column]
+        q1, q2, q3 = digest.quantile([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        summary = pd.DataFrame({
+            "lower": [max(digest.min, q1 - 1.5 * iqr)],
+            "q1": [q1], "median": [q2], "q3": [q3],
+            "upper": [min(digest.max, q3 + 1.5 * iqr)],
+        })
+        return summary, pd.DataFrame({column: [], "count": []})
+
+    def summary(self, kind=None):
+        """
+        Approximate equivalent of `DataFrameProfile.summary`; cardinality is a lower bound
+        once a column has more distinct values than its heavy-hitter capacity.
+        """
+
+        rows = []
+        for column in self.missing:
+            numeric = column in self.numeric
+            if kind and kind != ("numerical" if numeric else "categorical"):
+                continue
+            row = {
+                "column": column,
+                "kind": "numerical" if numeric else "categorical",
+                "missing": self.missing[column],
+                "missing_pct": self.missing[column] / self.n_rows if self.n_rows else 0.0,
+            }
+            if numeric:
+                digest = self.numeric[column]
+                row.update({"mean": digest.mean, "std": digest.std, "min": digest.min, "50%": digest.quantile(0.5), "max": digest.max})
+            else:
+                counts = self.categorical[column].value_counts()
+                row.update({
+                    "cardinality": len(counts),
+                    "top_value": counts.index[0] if len(counts) else None,
+                    "top_count": int(counts.iloc[0]) if len(counts) else 0,
+                })
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("column")
+
+
+def group_statistics_from_file(path, impute, chunksize=CHUNKSIZE):
+    """
+    Per-group fill values for every imputation step, in one streaming pass.
+
+    Returns:
+    -------
+    dict
+        Fill values (a Series indexed by group) keyed by (target, group, method),
+        as accepted by `utils.pipeline.preprocess`.
+    """
+
+    sketches = [GroupSketch(step["target"], step["group"], step.get("method", "mean")) for step in impute]
+    columns = sorted({col for sketch in sketches for col in (sketch.target_col, sketch.group_col)})
+    for chunk in stream_chunks(path, columns=columns, chunksize=chunksize):
+        for sketch in sketches:
+            sketch.update(chunk)
+    return {(s.target_col, s.group_col, s.method): s.values() for s in sketches}
+
+
+def preprocess_chunks(path, config, chunksize=CHUNKSIZE):
+    """
+    Yield `path` chunk by chunk, cleaned as `utils.pipeline.preprocess` would clean the whole file.
+
+    A first streaming pass estimates the imputation statistics over the full file, so
+    every chunk is filled with the same per-group values.
+    """
+
+    statistics = group_statistics_from_file(path, config.get("impute", []), chunksize)
+    for chunk in stream_chunks(path, chunksize=chunksize):
+        yield preprocess(chunk, config, statistics=statistics)
+
+
+def _fills_in_one_pass(steps):
+    """
+    Whether no imputation step reads a column that another step fills.
+    """
+
+    targets = [step["target"] for step in steps]
+    return len(set(targets)) == len(targets) and not set(targets) & {step["group"] for step in steps}
+
+
+def sketch_file(path, config=None, chunksize=CHUNKSIZE):
+    """
+    Build a `StreamingProfile` of a file that may not fit in memory.
+
+    The file is read once. Imputed columns are sketched without their missing values,
+    which are counted per group; once the group statistics are known, each group's
+    fill value is added as many times as it was missing. Only when one imputation step
+    reads a column another one fills is the file cleaned chunk by chunk, after a first
+    pass for the statistics.
+
+    Parameters:
+    ----------
+    path : str
+        A CSV or Feather file.
+    config : dict, optional
+        Pipeline config; when given, the statistics describe the cleaned data.
+    chunksize : int, optional
+        Rows per CSV chunk.
+
+    Returns:
+    -------
+    StreamingProfile
+    """
+
+    config = config or {}
+    steps = config.get("impute", [])
+    profile = StreamingProfile()
+    with stage("sketch") as record:
+        if not _fills_in_one_pass(steps):
+            for chunk in preprocess_chunks(path, config, chunksize):
+                profile.update(chunk)
+            record["rows"] = profile.n_rows
+            return profile
+
+        sketches = [GroupSketch(step["target"], step["group"], step.get("method", "mean")) for step in steps]
+        missing = [pd.Series(dtype="int64") for _ in steps]
+        rest = {key: value for key, value in config.items() if key != "impute"}
+        for chunk in stream_chunks(path, chunksize=chunksize):
+            for i, sketch in enumerate(sketches):
+                sketch.update(chunk)
+                groups = chunk.loc[chunk[sketch.target_col].isna(), sketch.group_col]
+                missing[i] = missing[i].add(groups.value_counts(), fill_value=0)
+            profile.update(preprocess(chunk, rest))
+
+        for sketch, counts in zip(sketches, missing):
+            # Rows whose group has no statistic stay missing, as in `fill_from_statistics`
+            values = sketch.values().reindex(counts.index)
+            known = values.notna().to_numpy()
+            filled = pd.Series(counts.to_numpy()[known], index=values.to_numpy()[known])
+            profile.fill(sketch.target_col, filled.groupby(level=0).sum())
+        record["rows"] = profile.n_rows
+    return profile
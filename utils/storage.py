@@ -0,0 +1,461 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils.timing import stage
+
+# Bump whenever a schema below changes so existing columnar files are rebuilt
+SCHEMA_VERSION = 1
+
+CACHE_DIR = ".cache"
+
+CUSTOMER_SCHEMA = {
+    "id": "int32",
+    "age": pd.CategoricalDtype(["16-25", "26-39", "40-64", "65+"], ordered=True),
+    "gender": "category",
+    "race": "category",
+    "driving_experience": pd.CategoricalDtype(["0-9y", "10-19y", "20-29y", "30y+"], ordered=True),
+    "education": pd.CategoricalDtype(["none", "high school", "university"], ordered=True),
+    "income": pd.CategoricalDtype(["poverty", "working class", "middle class", "upper class"], ordered=True),
+    "credit_score": "float32",
+    "vehicle_ownership": "boolean",
+    "vehicle_year": pd.CategoricalDtype(["before 2015", "after 2015"], ordered=True),
+    "married": "boolean",
+    "children": "boolean",
+    "postal_code": "int32",
+    "annual_mileage": "float32",
+    "vehicle_type": "category",
+    "speeding_violations": "int16",
+    "DUIs": "int16",
+    "past_accidents": "int16",
+    "outcome": "boolean",
+}
+
+# Explicit schemas by file name. utils.registry adds the schemas it infers for other files
+# by absolute path; files with neither fall back to pandas' dtype inference.
+SCHEMAS = {
+    "customer-data.csv": CUSTOMER_SCHEMA,
+}
+
+_hash_memo = {}
+_prefix_memo = {}
+_header_memo = {}
+
+
+def _digest(path, size=None):
+    digest = hashlib.sha1()
+    remaining = size
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20 if remaining is None else min(1 << 20, remaining)), b""):
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()[:16]
+
+
+def file_fingerprint(path):
+    """
+    Identify the current contents of a file.
+
+    The content hash is only recomputed when the file's mtime or size changes,
+    so calling this on every rerun costs a single `stat`.
+
+    Parameters:
+    ----------
+    path : str
+        Path to the source file.
+
+    Returns:
+    -------
+    str
+        A short hex digest that changes whenever the file is replaced.
+    """
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _hash_memo:
+        _hash_memo[key] = _digest(path)
+    return _hash_memo[key]
+
+
+def prefix_fingerprint(path, size):
+    """
+    The fingerprint the file had when it was `size` bytes long, if it has only grown since.
+
+    Returns None when the first `size` bytes do not end a line, since rows appended after
+    them would then continue the last row instead of starting a new one.
+    """
+
+    stat = os.stat(path)
+    if size <= 0 or size > stat.st_size:
+        return None
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, size)
+    if key not in _prefix_memo:
+        with open(path, "rb") as f:
+            f.seek(size - 1)
+            ends_line = f.read(1) == b"\n"
+        _prefix_memo[key] = _digest(path, size) if ends_line else None
+    return _prefix_memo[key]
+
+
+def clear_fingerprints():
+    _hash_memo.clear()
+    _prefix_memo.clear()
+    _header_memo.clear()
+
+
+def _is_number(text):
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def header_names(path):
+    """
+    Column names for a CSV without a header line, or None if it has one.
+
+    A first line of numbers only is taken as data, and its columns are named
+    'column_1', 'column_2' and so on. Like the fingerprint, the answer is only
+    worked out again when the file changes.
+    """
+
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _header_memo:
+        first = pd.read_csv(path, header=None, nrows=1, dtype=str, keep_default_na=False)
+        values = first.iloc[0].tolist() if len(first) else []
+        headerless = bool(values) and all(_is_number(value) for value in values)
+        _header_memo[key] = [f"column_{i + 1}" for i in range(len(values))] if headerless else None
+    return _header_memo[key]
+
+
+def csv_options(path):
+    """
+    The `pandas.read_csv` arguments that name the columns of `path`, whether or not it has a header line.
+    """
+
+    names = header_names(path)
+    return {} if names is None else {"header": None, "names": names}
+
+
+def csv_columns(path):
+    """
+    The column names of a CSV, reading only its first line.
+    """
+
+    return header_names(path) or pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def schema_for(path):
+    return SCHEMAS.get(os.path.abspath(path), SCHEMAS.get(os.path.basename(path)))
+
+
+def schema_key(schema):
+    """
+    Short digest of a schema, so columnar copies are rebuilt when the schema of their file changes.
+    """
+
+    items = sorted((col, repr(dtype)) for col, dtype in (schema or {}).items())
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:8]
+
+
+def cache_path(path, suffix, folder=CACHE_DIR):
+    """
+    Where the cache keeps a file derived from `path`, e.g. `cache_path(path, ".feather")`.
+
+    Files are named after the source plus a digest of its absolute path, so files with
+    the same name in different folders do not overwrite each other's copies.
+    """
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    return os.path.join(folder, f"{name}-{digest}{suffix}")
+
+
+def columnar_path(path):
+    return cache_path(path, ".feather")
+
+
+def _source_tag(path, version="", fingerprint=None):
+    return f"{fingerprint or file_fingerprint(path)}-v{SCHEMA_VERSION}-{version}".encode()
+
+
+def _has_levels(dtype):
+    return isinstance(dtype, pd.CategoricalDtype) and dtype.categories is not None
+
+
+def parse_dtypes(schema):
+    """
+    The dtypes to pass to `pandas.read_csv` for `schema`.
+
+    Categoricals with fixed levels are parsed as plain categories, since pandas turns
+    values outside the levels into NaN without a word; `apply_levels` then checks them.
+    """
+
+    if schema is None:
+        return None
+    return {col: "category" if _has_levels(dtype) else dtype for col, dtype in schema.items()}
+
+
+def apply_levels(df, schema, path):
+    """
+    Give the columns parsed by `parse_dtypes` the levels of their schema, in place.
+
+    Raises:
+    -------
+    ValueError
+        If a column holds a value that is not one of its levels, rather than losing it.
+    """
+
+    for col, dtype in (schema or {}).items():
+        if not _has_levels(dtype) or col not in df.columns:
+            continue
+        parsed = df[col].cat
+        # read_csv parses categories as strings, whatever the type of the schema's levels
+        positions = pd.Index(dtype.categories.astype(str)).get_indexer(parsed.categories.astype(str))
+        unknown = parsed.categories[positions < 0]
+        if len(unknown):
+            raise ValueError(
+                f"{os.path.basename(path)}: column '{col}' has values outside its schema: {unknown.tolist()}. "
+                "Add them to the schema to load the file."
+            )
+        # Missing values have code -1, which picks the -1 appended at the end
+        codes = np.append(positions, -1)[parsed.codes.to_numpy()]
+        df[col] = pd.Categorical.from_codes(codes, dtype=dtype)
+    return df
+
+
+def convert_to_columnar(path, dest=None, schema=None):
+    """
+    Parse a CSV once with an explicit schema and write it as an uncompressed Feather file.
+
+    The source fingerprint and schema version are stored in the file metadata so a
+    stale copy can be detected without reading any column data.
+
+    Raises ValueError if a categorical column holds a value outside its levels.
+
+    Parameters:
+    ----------
+    path : str
+        The source CSV.
+    dest : str, optional
+        Output path. Defaults to `columnar_path(path)`.
+    schema : dict, optional
+        Column dtypes passed to `pandas.read_csv`. Defaults to `schema_for(path)`.
+
+    Returns:
+    -------
+    str
+        The path of the written file.
+    """
+
+    dest = dest or columnar_path(path)
+    schema = schema if schema is not None else schema_for(path)
+
+    with stage("csv_parse") as record:
+        df = apply_levels(pd.read_csv(path, dtype=parse_dtypes(schema), **csv_options(path)), schema, path)
+        record["rows"], record["bytes"] = len(df), os.path.getsize(path)
+    return write_columnar(df, path, dest, version=schema_key(schema))
+
+
+def write_columnar(df, path, dest, version="", metadata=None):
+    """
+    Write `df` as an uncompressed Feather file tagged with the fingerprint and size of its source `path`.
+
+    `version` is added to the tag for files derived from the source, e.g. by a
+    particular pipeline config. `metadata` adds other entries to the file metadata.
+
+    The file is written under a temporary name and moved into place, so concurrent
+    readers never see a partial file.
+
+    Returns:
+    -------
+    str
+        `dest`.
+    """
+
+    with stage("columnar_write", len(df)) as record:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # The size is read first: if the file grows meanwhile, the tag no longer matches its prefix
+        size = os.path.getsize(path)
+        tags = {b"source": _source_tag(path, version), b"size": str(size).encode()}
+        table = table.replace_schema_metadata({**table.schema.metadata, **(metadata or {}), **tags})
+
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest) or ".", suffix=".tmp")
+        os.close(fd)
+        # Uncompressed so the file can be memory-mapped instead of decoded
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, dest)
+        record["bytes"] = os.path.getsize(dest)
+    return dest
+
+
+def is_fresh(path, dest=None, version=""):
+    """
+    Whether the columnar copy of `path` exists and matches the current source, schema and `version`.
+    """
+
+    dest = dest or columnar_path(path)
+    if not os.path.exists(dest):
+        return False
+    metadata = read_schema(dest).metadata or {}
+    return metadata.get(b"source") == _source_tag(path, version)
+
+
+def appended_offset(path, dest=None, version=""):
+    """
+    The byte offset of the rows appended to `path` since its columnar copy was written,
+    or None if the file changed in any other way (or not at all).
+
+    The copy must have been written from the first bytes of the current file, with the
+    same schema and `version`.
+    """
+
+    dest = dest or columnar_path(path)
+    if not os.path.exists(dest):
+        return None
+    metadata = read_schema(dest).metadata or {}
+    size = int(metadata.get(b"size", 0))
+    if size >= os.path.getsize(path):
+        return None
+    fingerprint = prefix_fingerprint(path, size)
+    if fingerprint is None or metadata.get(b"source") != _source_tag(path, version, fingerprint):
+        return None
+    return size
+
+
+def read_schema(dest):
+    """
+    The Arrow schema of a Feather file, read without touching any column data.
+    """
+
+    with pa.memory_map(dest) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def read_columnar(dest, columns=None):
+    """
+    Memory-map a Feather file and return it as a DataFrame.
+
+    Parameters:
+    ----------
+    dest : str
+        The Feather file.
+    columns : list of str, optional
+        Only read these columns.
+
+    Returns:
+    -------
+    pandas.DataFrame
+    """
+
+    with stage("columnar_read") as record:
+        table = feather.read_table(dest, columns=columns, memory_map=True)
+        record["rows"], record["bytes"] = table.num_rows, table.nbytes
+        # split_blocks avoids consolidating columns into 2-D blocks, which would copy them
+        return table.to_pandas(split_blocks=True)
+
+
+def read_csv_tail(path, offset, columns, schema=None):
+    """
+    Parse the rows of a CSV that start at byte `offset`, which has no header line.
+
+    Raises ValueError if a categorical column holds a value outside its levels.
+    """
+
+    with stage("csv_parse") as record:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            tail = apply_levels(pd.read_csv(f, header=None, names=columns, dtype=parse_dtypes(schema)), schema, path)
+        record["rows"], record["bytes"] = len(tail), os.path.getsize(path) - offset
+    return tail
+
+
+def _concat_rows(head, tail):
+    """
+    `head` followed by `tail`, with categorical columns widened to the levels of both.
+    """
+
+    for col in head.columns:
+        dtype = head[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and tail[col].dtype != dtype:
+            levels = tail[col].astype("category").cat.categories
+            if not levels.isin(dtype.categories).all():
+                dtype = pd.CategoricalDtype(dtype.categories.union(levels), ordered=dtype.ordered)
+                head[col] = head[col].astype(dtype)
+            tail[col] = tail[col].astype(dtype)
+    return pd.concat([head, tail], ignore_index=True)
+
+
+def append_to_columnar(path, offset, dest=None, schema=None):
+    """
+    Bring the columnar copy of `path` up to date by parsing only the rows after `offset`.
+
+    The new rows are added after the existing ones, so row `i` of the copy is still the
+    `i`th row of the file. The copy records where the appended rows start.
+
+    Parameters:
+    ----------
+    path : str
+        The source CSV.
+    offset : int
+        Where the appended rows start, as returned by `appended_offset`.
+    dest : str, optional
+        The columnar copy. Defaults to `columnar_path(path)`.
+    schema : dict, optional
+        Column dtypes passed to `pandas.read_csv`. Defaults to `schema_for(path)`.
+
+    Returns:
+    -------
+    str
+        The path of the written file.
+    """
+
+    dest = dest or columnar_path(path)
+    schema = schema if schema is not None else schema_for(path)
+
+    head = read_columnar(dest)
+    tail = read_csv_tail(path, offset, head.columns.tolist(), schema)
+    metadata = {b"appended_from": str(len(head)).encode()}
+    return write_columnar(_concat_rows(head, tail), path, dest, version=schema_key(schema), metadata=metadata)
+
+
+def load_dataset(path, columns=None):
+    """
+    Load a CSV through its columnar cache, converting it first if the cache is missing or stale.
+
+    When rows were only appended to the CSV since it was converted, just those rows are parsed.
+
+    Parameters:
+    ----------
+    path : str
+        The source CSV.
+    columns : list of str, optional
+        Only read these columns.
+
+    Returns:
+    -------
+    pandas.DataFrame
+    """
+
+    dest = columnar_path(path)
+    version = schema_key(schema_for(path))
+    if not is_fresh(path, dest, version=version):
+        offset = appended_offset(path, dest, version=version)
+        if offset is not None:
+            try:
+                append_to_columnar(path, offset, dest)
+            except ValueError:
+                # e.g. a new level in the appended rows; a full parse raises if it is still unknown
+                offset = None
+        if offset is None:
+            convert_to_columnar(path, dest)
+    return read_columnar(dest, columns=columns)
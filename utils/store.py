@@ -0,0 +1,205 @@
+import json
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from utils.pipeline import CUSTOMER_DATA, CUSTOMER_PIPELINE, config_key, preprocess
+from utils.sketches import GroupSketch
+from utils.storage import (appended_offset, cache_path, clear_fingerprints, csv_columns, file_fingerprint, is_fresh,
+                           load_dataset, prefix_fingerprint, read_columnar, read_schema, schema_for, schema_key,
+                           write_columnar)
+from utils.timing import stage
+
+
+def clean_path(path):
+    return cache_path(path, ".clean.feather")
+
+
+def _imputation_sketches(config):
+    """
+    One mean `GroupSketch` per imputation step, or None if a step uses a statistic whose
+    partial results cannot be added together.
+    """
+
+    steps = config.get("impute", [])
+    if any(step.get("method", "mean") != "mean" for step in steps):
+        return None
+    return [GroupSketch(step["target"], step["group"], "mean") for step in steps]
+
+
+def _encode_sketches(sketches):
+    return json.dumps([
+        {"groups": sketch.sums.index.tolist(), "sums": sketch.sums.tolist(), "counts": sketch.counts.tolist()}
+        for sketch in sketches
+    ]).encode()
+
+
+def _restore_sketches(sketches, encoded):
+    for sketch, state in zip(sketches, json.loads(encoded)):
+        sketch.sums = pd.Series(state["sums"], index=state["groups"], dtype="float64")
+        sketch.counts = pd.Series(state["counts"], index=state["groups"], dtype="int64")
+
+
+def ensure_clean_file(path, config, dest=None):
+    """
+    Preprocess `path` into its own Feather file unless an up-to-date one already exists.
+
+    The file is tagged with the source fingerprint, the pipeline key and the read schema,
+    so it is only rebuilt when one of them changes.
+
+    When rows were only appended to the source, the per-group sums and counts behind the
+    imputed means are stored with the file, so they are updated from the new rows alone
+    instead of being recomputed over every row. The file then records its lineage, the
+    version it extended and where the new rows start, for `appended_since`.
+
+    Returns:
+    -------
+    str
+        The path of the preprocessed file.
+    """
+
+    dest = dest or clean_path(path)
+    key = f"{config_key(config)}-{schema_key(schema_for(path))}"
+    if is_fresh(path, dest, version=key):
+        return dest
+
+    offset = appended_offset(path, dest, version=key)
+    df = load_dataset(path)
+    sketches = _imputation_sketches(config)
+    if sketches is None:
+        write_columnar(preprocess(df, config), path, dest, version=key)
+        return dest
+
+    metadata = {}
+    start = 0
+    if offset is not None:
+        previous = read_schema(dest).metadata
+        if b"statistics" in previous:
+            _restore_sketches(sketches, previous[b"statistics"])
+            start = int(previous[b"rows"])
+            parent = f"{prefix_fingerprint(path, offset)}-{config_key(config)}"
+            lineage = {"version": f"{file_fingerprint(path)}-{config_key(config)}", "parent": parent, "start": start}
+            metadata[b"lineage"] = json.dumps(lineage).encode()
+
+    appended = df.iloc[start:]
+    with stage("impute_statistics", len(appended)):
+        for sketch in sketches:
+            sketch.update(appended)
+    statistics = {(s.target_col, s.group_col, s.method): s.values() for s in sketches}
+    metadata.update({b"statistics": _encode_sketches(sketches), b"rows": str(len(df)).encode()})
+    write_columnar(preprocess(df, config, statistics=statistics), path, dest, version=key, metadata=metadata)
+    return dest
+
+
+def build_clean_frame(path, config, dest=None, columns=None):
+    """
+    Memory-map the preprocessed copy of `path`, building it first if needed.
+
+    Every process that maps the file shares the same page cache, and the mapped buffers
+    are read-only, so nothing can modify the frame in place.
+
+    Parameters:
+    ----------
+    path : str
+        The source CSV.
+    config : dict
+        Pipeline config, as for `preprocess`.
+    dest : str, optional
+        Where to keep the preprocessed file. Defaults to `clean_path(path)`.
+    columns : list of str, optional
+        Only map these columns.
+
+    Returns:
+    -------
+    pandas.DataFrame
+    """
+
+    return read_columnar(ensure_clean_file(path, config, dest), columns=columns)
+
+
+def _kind(dtype):
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+        return "categorical"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numerical"
+    return "other"
+
+
+def column_kinds(path=CUSTOMER_DATA, config=CUSTOMER_PIPELINE):
+    """
+    'categorical', 'numerical' or 'other' (e.g. free text) for every column of the
+    preprocessed dataset, in file order.
+
+    When the file's schema covers every column, the kinds come from the schema and the
+    CSV header alone, so pages can pick their columns before anything is parsed or
+    cleaned. Otherwise the schema of the preprocessed file is read.
+    """
+
+    schema = schema_for(path) or {}
+    header = csv_columns(path)
+    if all(col in schema for col in header):
+        drop = set(config.get("drop", []))
+        return {col: _kind(schema[col]) for col in header if col not in drop}
+
+    kinds = {}
+    for field in read_schema(ensure_clean_file(path, config)):
+        if pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+            kinds[field.name] = "numerical"
+        elif pa.types.is_dictionary(field.type) or pa.types.is_boolean(field.type):
+            kinds[field.name] = "categorical"
+        else:
+            kinds[field.name] = "other"
+    return kinds
+
+
+# cache_resource hands every session the same object instead of unpickling a private copy
+@st.cache_resource(show_spinner="Preparing data...", max_entries=16)
+def _shared_clean_data(path, fingerprint, pipeline_key, columns, _config):
+    return build_clean_frame(path, _config, columns=None if columns is None else list(columns))
+
+
+def load_clean_data(path=CUSTOMER_DATA, config=CUSTOMER_PIPELINE, columns=None):
+    """
+    The preprocessed dataset, shared by every session, and its version string.
+
+    The frame must be treated as read-only; with copy-on-write enabled, frames derived
+    from it copy only the columns they change. The version changes whenever the source
+    file or the pipeline config does, so it can be passed to other cached functions as
+    their cache key.
+
+    Parameters:
+    ----------
+    columns : list of str, optional
+        Only load these columns. Defaults to every column.
+
+    Returns:
+    -------
+    tuple of (pandas.DataFrame, str)
+    """
+
+    fingerprint = file_fingerprint(path)
+    pipeline_key = config_key(config)
+    columns = None if columns is None else tuple(columns)
+    return _shared_clean_data(path, fingerprint, pipeline_key, columns, config), f"{fingerprint}-{pipeline_key}"
+
+
+def appended_since(path=CUSTOMER_DATA, config=CUSTOMER_PIPELINE):
+    """
+    How the current preprocessed data extends an earlier version, if it does.
+
+    Returns:
+    -------
+    dict or None
+        'version' (as returned by `load_clean_data`), 'parent' (the version it appended
+        rows to) and 'start' (the first appended row), or None after a full rebuild.
+    """
+
+    metadata = read_schema(ensure_clean_file(path, config)).metadata
+    return json.loads(metadata[b"lineage"]) if b"lineage" in metadata else None
+
+
+def invalidate_cache():
+    clear_fingerprints()
+    _shared_clean_data.clear()
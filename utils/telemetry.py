@@ -0,0 +1,74 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from utils.timing import Timings, log_timings, stage
+
+# How many past reruns the diagnostics panel keeps per session
+HISTORY = 50
+
+# Pages this process has drawn at least once; the first draw of each one is a cold start
+_drawn_pages = set()
+
+
+class RerunTimer(Timings):
+    """
+    Timings of one Streamlit rerun, including the time from the top of the script to its first chart.
+
+    Create it at the top of the script, draw charts through `chart` and call `finish` at
+    the end. The first-paint marks of each rerun are tagged cold or warm, and every rerun
+    is logged as JSON and kept in `st.session_state["timings"]`.
+
+    Set `detailed` to also time building each chart's spec and record its JSON size. That
+    builds the spec a second time, so it is only meant for diagnosing.
+    """
+
+    detailed = False
+
+    def chart(self, chart, **kwargs):
+        rows = len(chart.data) if isinstance(chart.data, pd.DataFrame) else None
+        if self.detailed:
+            with stage("chart_spec", rows) as record:
+                try:
+                    record["bytes"] = len(chart.to_json().encode())
+                except alt.MaxRowsError:
+                    pass
+        with stage("chart_render", rows):
+            st.altair_chart(chart, **kwargs)
+        if "first_chart" not in self.marks:
+            self.mark("first_chart")
+
+    def finish(self):
+        record = log_timings(self, start="warm" if self.page in _drawn_pages else "cold")
+        if "first_chart" in self.marks:
+            _drawn_pages.add(self.page)
+        history = st.session_state.setdefault("timings", [])
+        history.append(record)
+        del history[:-HISTORY]
+        return record
+
+
+def diagnostics_panel(timer):
+    """
+    Show the stages of the current rerun and the recent rerun history.
+    """
+
+    st.caption(f"This rerun: {timer.elapsed_ms():,.0f} ms")
+    stages = timer.frame()
+    if len(stages):
+        stages = stages.groupby("stage", sort=False).agg(calls=("ms", "size"), ms=("ms", "sum"), rows=("rows", "max"), bytes=("bytes", lambda sizes: sizes.sum(min_count=1)))
+        st.dataframe(stages.style.format({"ms": "{:.1f}", "rows": "{:,.0f}", "bytes": "{:,.0f}"}, na_rep=""), use_container_width=True)
+    else:
+        st.write("Every stage was served from cache.")
+
+    history = st.session_state.get("timings", [])
+    if history:
+        st.caption("Recent reruns")
+        st.dataframe(
+            pd.DataFrame([
+                {"page": record["page"], "start": record["start"], "total_ms": record["total_ms"], **record["marks"]}
+                for record in reversed(history)
+            ]),
+            hide_index=True,
+            use_container_width=True,
+        )
@@ -0,0 +1,186 @@
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from utils.storage import CACHE_DIR, cache_path, file_fingerprint, is_fresh, read_columnar, write_columnar
+from utils.timing import stage, timed
+
+AEP_YEARLY_DIR = "datasets/AEP Hourly"
+AEP_LEGACY_PATH = "datasets/AEP_hourly.csv"
+
+# Both sources are indexed on the local (EPT) end of the hour, which is how AEP_hourly.csv
+# stamps its rows. The yearly PJM exports spell timestamps out as "1/1/2013 5:00:00 AM".
+YEARLY_COLUMNS = {"datetime_ending_ept": "datetime", "estimated_load_hourly": "load_mw"}
+YEARLY_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+LEGACY_COLUMNS = {"Datetime": "datetime", "AEP_MW": "load_mw"}
+LEGACY_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _read_chunked(path, columns, date_format, chunksize):
+    """
+    Stream one CSV in chunks, parsing only the needed columns with an explicit datetime format.
+    """
+
+    frames = []
+    for chunk in pd.read_csv(path, usecols=list(columns), chunksize=chunksize):
+        chunk = chunk.rename(columns=columns)
+        frames.append(pd.DataFrame({
+            "datetime": pd.to_datetime(chunk["datetime"], format=date_format),
+            "load_mw": chunk["load_mw"].astype("float32"),
+        }))
+    if not frames:
+        return pd.DataFrame({"datetime": pd.Series(dtype="datetime64[ns]"), "load_mw": pd.Series(dtype="float32")})
+    return pd.concat(frames, ignore_index=True)
+
+
+def _load_file(path, columns, date_format, chunksize):
+    """
+    Parse a single file, reusing its columnar copy when the source has not changed.
+    """
+
+    dest = cache_path(path, ".feather", os.path.join(CACHE_DIR, "aep"))
+    if is_fresh(path, dest):
+        return read_columnar(dest)
+
+    frame = _read_chunked(path, columns, date_format, chunksize)
+    write_columnar(frame, path, dest)
+    return frame
+
+
+def aep_sources(directory=AEP_YEARLY_DIR, legacy_path=AEP_LEGACY_PATH):
+    """
+    The yearly files in `directory`, sorted, followed by the legacy single file if it exists.
+
+    Returns:
+    -------
+    list of str
+    """
+
+    paths = sorted(glob.glob(os.path.join(directory, "*.csv")))
+    if legacy_path and os.path.exists(legacy_path):
+        paths.append(legacy_path)
+    return paths
+
+
+def aep_fingerprint(sources):
+    """
+    Combined fingerprint of every source file, for keying in-memory caches.
+    """
+
+    return "-".join(file_fingerprint(path) for path in sources)
+
+
+def load_aep_hourly(directory=AEP_YEARLY_DIR, legacy_path=AEP_LEGACY_PATH, workers=None, chunksize=100_000):
+    """
+    Union the AEP hourly load files into one time-indexed frame.
+
+    Files are parsed in parallel, each streamed in chunks. Every file has its own
+    columnar cache, so after the first run only years whose file changed are read again.
+    Where sources overlap the yearly exports win over the legacy file; the repeated local
+    hour at the end of daylight saving time keeps its first reading.
+
+    Parameters:
+    ----------
+    directory : str, optional
+        Folder with one PJM export per year.
+    legacy_path : str, optional
+        The single-file AEP_hourly.csv export, or None to skip it.
+    workers : int, optional
+        Number of files parsed concurrently. Defaults to the executor's choice.
+    chunksize : int, optional
+        Rows per parsing chunk.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        Sorted, duplicate-free frame indexed by 'datetime' with a float32 'load_mw' column.
+    """
+
+    jobs = [
+        (path, LEGACY_COLUMNS, LEGACY_FORMAT) if path == legacy_path else (path, YEARLY_COLUMNS, YEARLY_FORMAT)
+        for path in aep_sources(directory, legacy_path)
+    ]
+
+    # Stages recorded inside the worker threads are not attributed to the rerun, so time the whole load
+    with stage("aep_load") as record:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            frames = list(executor.map(lambda job: _load_file(*job, chunksize), jobs))
+        record["rows"] = sum(len(frame) for frame in frames)
+
+    if not frames:
+        return pd.DataFrame({"load_mw": pd.Series(dtype="float32")}, index=pd.DatetimeIndex([], name="datetime"))
+
+    # Jobs are ordered with the legacy file last, so keep="first" prefers the yearly exports
+    frame = pd.concat(frames, ignore_index=True)
+    frame = frame.dropna(subset=["datetime"]).drop_duplicates(subset="datetime", keep="first")
+    return frame.set_index("datetime").sort_index()
+
+
+# Finest first; the step is the typical spacing between points at that resolution.
+# Weeks start on Monday, so every rule labels its periods by their start.
+RESOLUTIONS = {
+    "hourly": ("h", pd.Timedelta(hours=1)),
+    "daily": ("D", pd.Timedelta(days=1)),
+    "weekly": ("W-MON", pd.Timedelta(weeks=1)),
+    "monthly": ("MS", pd.Timedelta(days=30)),
+}
+
+
+@timed("rollups")
+def build_rollups(frame, column="load_mw"):
+    """
+    Precompute min/mean/max of `column` at every resolution in `RESOLUTIONS`.
+
+    Parameters:
+    ----------
+    frame : pandas.DataFrame
+        Time-indexed frame, as returned by `load_aep_hourly`.
+    column : str, optional
+        The value column to summarise.
+
+    Returns:
+    -------
+    dict of str to pandas.DataFrame
+        One sorted frame per resolution, indexed by period start, with 'min', 'mean' and 'max'.
+    """
+
+    series = frame[column].astype("float64")
+    return {
+        name: series.resample(rule, label="left", closed="left").agg(["min", "mean", "max"]).dropna()
+        for name, (rule, _) in RESOLUTIONS.items()
+    }
+
+
+def choose_resolution(start, end, max_points=1500):
+    """
+    The finest resolution that draws at most `max_points` points between `start` and `end`.
+    """
+
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for name, (_, step) in RESOLUTIONS.items():
+        if span / step <= max_points:
+            return name
+    return name
+
+
+def rollup_window(rollups, start, end, max_points=1500):
+    """
+    Slice the appropriate rollup to [start, end].
+
+    The slice is a binary search on the sorted index, so the cost depends on the number
+    of points drawn rather than on how many years are loaded.
+
+    Returns:
+    -------
+    tuple of (str, pandas.DataFrame)
+        The chosen resolution and the rows to plot, with the period start as a 'datetime' column.
+    """
+
+    resolution = choose_resolution(start, end, max_points)
+    rollup = rollups[resolution]
+    # Periods are labelled by their start, so also keep the one already under way at `start`
+    first = max(rollup.index.searchsorted(pd.Timestamp(start), side="right") - 1, 0)
+    window = rollup.iloc[first:].loc[:pd.Timestamp(end)]
+    return resolution, window.rename_axis("datetime").reset_index()
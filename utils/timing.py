@@ -0,0 +1,112 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger("eda.timings")
+
+# The collector of the rerun being executed. Streamlit runs each session's script in its
+# own thread, so concurrent sessions never record into each other's timings.
+_active = contextvars.ContextVar("timings", default=None)
+
+
+class Timings:
+    """
+    Stage durations, row counts and payload sizes collected during one rerun.
+
+    Stages are recorded by `stage` and `timed` while the collector is active, wherever
+    they run in the call stack; with no active collector they cost a context variable lookup.
+    """
+
+    def __init__(self, page=None):
+        self.started = time.perf_counter()
+        self.page = page
+        self.marks = {}
+        self.stages = []
+
+    def activate(self):
+        _active.set(self)
+        return self
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def mark(self, name):
+        """
+        Record the time since the start of the rerun, keeping the first time `name` is reached.
+        """
+
+        self.marks.setdefault(name, self.elapsed_ms())
+
+    def frame(self):
+        """
+        One row per recorded stage: 'stage', 'ms', 'rows' and 'bytes', in the order they finished.
+        """
+
+        return pd.DataFrame(self.stages, columns=["stage", "ms", "rows", "bytes"])
+
+    def to_record(self):
+        return {
+            "page": self.page,
+            "total_ms": round(self.elapsed_ms(), 1),
+            "marks": {name: round(ms, 1) for name, ms in self.marks.items()},
+            "stages": [{**stage, "ms": round(stage["ms"], 2)} for stage in self.stages],
+        }
+
+
+@contextmanager
+def stage(name, rows=None):
+    """
+    Time the enclosed block as stage `name` of the active rerun.
+
+    Yields the stage record, so the block can fill in 'rows' or 'bytes' once they are known.
+    """
+
+    timings = _active.get()
+    record = {"stage": name, "rows": rows, "bytes": None}
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        if timings is not None:
+            record["ms"] = (time.perf_counter() - started) * 1000
+            timings.stages.append(record)
+
+
+def timed(name):
+    """
+    Decorator timing every call as stage `name`, with the length of the first argument as its row count.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            rows = len(args[0]) if args and isinstance(args[0], (pd.DataFrame, pd.Series)) else None
+            with stage(name, rows):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_timings(timings, **fields):
+    """
+    Emit the rerun, plus any extra `fields`, as one JSON line on the 'eda.timings' logger.
+
+    The logger writes to stderr, or appends to the file named by the EDA_TIMING_LOG
+    environment variable, so production log collectors can pick it up.
+    """
+
+    if not logger.handlers:
+        path = os.environ.get("EDA_TIMING_LOG")
+        logger.addHandler(logging.FileHandler(path) if path else logging.StreamHandler())
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    record = {"event": "rerun", "time": time.time(), **fields, **timings.to_record()}
+    logger.info(json.dumps(record, default=str))
+    return record
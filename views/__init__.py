@@ -0,0 +1,22 @@
+import importlib
+
+# Navigation order. A page module is only imported the first time its page is opened.
+PAGES = {
+    "Categorical Univariate": ("views.categorical", "1-circle-fill"),
+    "Numerical Univariate": ("views.numerical", "2-circle-fill"),
+    "Bivariate": ("views.bivariate", "3-circle-fill"),
+    "Multivariate": ("views.multivariate", "4-circle-fill"),
+    "Association Matrix": ("views.association", "5-circle-fill"),
+    "Time Series": ("views.timeseries", "6-circle-fill"),
+}
+
+
+def load_page(name):
+    """
+    Import the module behind page `name`.
+
+    Every page module declares `COLUMNS`, the dataset columns it reads (see
+    `views.common.PageContext`), and a `render(ctx)` function that draws the page.
+    """
+
+    return importlib.import_module(PAGES[name][0])
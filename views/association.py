@@ -0,0 +1,88 @@
+import altair as alt
+import streamlit as st
+
+from utils.association import association_matrix
+
+COLUMNS = None
+
+# Larger matrices are still computed, but drawing them makes cells too small to read
+MAX_MATRIX_COLUMNS = 30
+TOP_PAIRS = 20
+
+
+@st.cache_data(max_entries=16, show_spinner="Computing associations...")
+def cached_associations(_df, data_version, numerical, categorical, method, _cube=None):
+    return association_matrix(_df, list(numerical), list(categorical), method=method, cube=_cube)
+
+
+def strongest_pairs(associations, columns, n=TOP_PAIRS):
+    """
+    The `n` pairs with the largest absolute association, each pair once.
+    """
+
+    order = {col: i for i, col in enumerate(columns)}
+    pairs = associations[associations["var1"].map(order) < associations["var2"].map(order)]
+    pairs = pairs.dropna(subset=["value"])
+    return pairs.reindex(pairs["value"].abs().sort_values(ascending=False).index).head(n).reset_index(drop=True)
+
+
+def render(ctx):
+    st.header("Association Analysis")
+    st.write("")
+    st.write("")
+
+    all_columns = ctx.columns
+    if len(all_columns) < 2:
+        st.info(f"{ctx.dataset.name} needs at least two categorical or numerical columns for this analysis.", icon="ℹ️")
+        return
+
+    numerical, categorical = ctx.columns_of("numerical"), ctx.columns_of("categorical")
+    method = st.radio("Correlation of numerical pairs", ["Pearson", "Spearman"], horizontal=True)
+    cube = ctx.cube if len(categorical) > 1 else None
+    associations = cached_associations(ctx.df, ctx.data_version, tuple(numerical), tuple(categorical), method.lower(), cube)
+
+    selected = st.multiselect(
+        "Columns in the matrix", all_columns, default=all_columns[:MAX_MATRIX_COLUMNS], format_func=ctx.dataset.title
+    )
+    if len(selected) < 2:
+        st.info("Select at least two columns to draw the matrix.", icon="ℹ️")
+    else:
+        shown = associations[associations["var1"].isin(selected) & associations["var2"].isin(selected)]
+        size = max(400, 20 * len(selected))
+        heatmap = alt.Chart(shown).mark_rect().encode(
+            x=alt.X('var2:N', sort=selected, title=None, axis=alt.Axis(labelAngle=-45)),
+            y=alt.Y('var1:N', sort=selected, title=None),
+            color=alt.Color('value:Q', scale=alt.Scale(scheme='redblue', domain=[-1, 1]), title="Association"),
+            tooltip=[
+                alt.Tooltip('var1:N', title="Variable"),
+                alt.Tooltip('var2:N', title="Against"),
+                alt.Tooltip('measure:N', title="Measure"),
+                alt.Tooltip('value:Q', format='.3f', title="Value")
+            ]
+        ).properties(
+            height=size,
+            width=size
+        ).configure_axis(
+            labelFontSize=14,
+            grid=False
+        ).configure_view(
+            strokeOpacity=0
+        )
+
+        ctx.chart(heatmap)
+
+    st.subheader("Strongest Associations")
+    top = strongest_pairs(associations, all_columns)
+    top[["var1", "var2"]] = top[["var1", "var2"]].apply(lambda col: col.map(ctx.dataset.title))
+    st.dataframe(top.rename(columns={"var1": "Variable", "var2": "Against", "measure": "Measure", "value": "Value"}),
+                 hide_index=True, use_container_width=True)
+
+    st.info(f"""
+        The matrix compares every pair of columns with the measure that suits their types:
+
+        1. Two numerical columns: their {method} correlation, from -1 to 1. The sign shows whether they rise together or in opposite directions.
+        2. Two categorical columns: Cramér's V, from 0 (independent) to 1 (one determines the other).
+        3. A numerical and a categorical column: the correlation ratio, from 0 (every category has the same mean) to 1 (the category determines the value).
+
+        Strong associations are worth a closer look on the Bivariate page. Remember that association does not imply causation.
+    """, icon="ℹ️")
@@ -0,0 +1,118 @@
+import altair as alt
+import streamlit as st
+
+from utils.charts import boxplot_chart, density_scatter_chart
+from utils.registry import CUSTOMER
+from views.common import cached_boxplot, cached_scatter
+
+COLUMNS = None
+
+
+def render(ctx):
+    st.header("Bivariate Analysis")
+    st.write("")
+    st.write("")
+
+    all_columns = ctx.columns
+    categorical_columns = ctx.columns_of("categorical")
+    if len(all_columns) < 2:
+        st.info(f"{ctx.dataset.name} needs at least two categorical or numerical columns for this analysis.", icon="ℹ️")
+        return
+
+    default1, default2 = ctx.dataset.default("bivariate", all_columns)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        var1 = st.selectbox("Select first variable", all_columns, index=all_columns.index(default1))
+    with col2:
+        other_columns = [col for col in all_columns if col != var1]
+        var2 = st.selectbox("Select second variable", other_columns, index=other_columns.index(default2) if default2 in other_columns else 0)
+
+    var1_type = "categorical" if var1 in categorical_columns else "numerical"
+    var2_type = "categorical" if var2 in categorical_columns else "numerical"
+
+    if var1_type == "categorical" and var2_type == "categorical":
+        df_grouped = ctx.cube.pair(var1, var2)[[var1, var2, 'count', 'total', 'percentage']]
+
+        sort_order = ctx.dataset.sort_order(var1)
+
+        color_scheme = alt.Scale(scheme='blues')
+
+        stacked_chart = alt.Chart(df_grouped).mark_bar(cornerRadiusTopLeft=25, cornerRadiusTopRight=25).encode(
+            x=alt.X(f'{var1}:N', sort=sort_order, title=var1.replace('_', ' ').title(), axis=alt.Axis(labelAngle=0)),
+            y=alt.Y('percentage:Q', axis=alt.Axis(format='%'), title="Percentage"),
+            color=alt.Color(f'{var2}:N', scale=color_scheme, legend=alt.Legend(title=var2.replace('_', ' ').title())),
+            tooltip=[
+                alt.Tooltip(f'{var1}:N', title=var1.replace('_', ' ').title()), 
+                alt.Tooltip(f'{var2}:N', title=var2.replace('_', ' ').title()), 
+                alt.Tooltip('percentage:Q', format='.2%', title='Percentage')
+            ]
+        ).properties(
+            height=500
+        ).configure_axis(
+            labelFontSize=16,
+            titleFontSize=18,
+            grid=False
+        ).configure_view(
+            strokeOpacity=0
+        )
+
+        ctx.chart(stacked_chart)
+
+    elif var1_type == "numerical" and var2_type == "numerical":
+        cells = cached_scatter(ctx.df, ctx.data_version, var1, var2)
+        scatter_chart = density_scatter_chart(cells, var1, var2).properties(
+            height=500
+        ).configure_axis(
+            labelFontSize=16,
+            titleFontSize=18,
+            grid=False
+        ).configure_view(
+            strokeOpacity=0
+        )
+
+        ctx.chart(scatter_chart)
+
+    else:
+        if var1_type == "categorical":
+            cat_var, num_var = var1, var2
+        else:
+            cat_var, num_var = var2, var1
+
+        sort_order = ctx.dataset.sort_order(cat_var)
+
+        summary, outliers = cached_boxplot(ctx.df, ctx.data_version, num_var, cat_var)
+        chart = boxplot_chart(summary, outliers, num_var, group_col=cat_var, sort_order=sort_order, size=50).properties(
+            height=500
+        ).configure_axis(
+            labelFontSize=16,
+            titleFontSize=18,
+            grid=False
+        ).configure_view(
+            strokeOpacity=0
+        )
+
+        ctx.chart(chart)
+
+    if ctx.dataset is CUSTOMER and var1 == "education" and var2 == "outcome":
+        st.info("""
+            The plot illustrates the percentage of insurance claims for each education level, with orange representing claimed (true) and blue representing unclaimed (false). It seems that higher education levels correspond with a lower percentage of claims. This trend deserves further examination.
+
+            According to the plot, most of our clients are from high school and university backgrounds, but these groups have the lowest claim percentages. The reason for this discrepancy is not immediately clear.
+
+            Additionally, the 'none' category is ambiguous and has the lowest number of clients, yet it shows the highest percentage of claims. This discrepancy emphasizes the need to break down the 'none' group further to understand its composition. It is crucial to clarify what 'none' represents, as this category might reveal important insights that are currently obscured.
+
+            We should reassess our marketing strategy and identify our target audience more precisely to avoid potentially losing valuable clients. Further analysis of the 'none' category will help us make more informed decisions.
+        """, icon="ℹ️")
+    else:
+        st.info(f"""
+            This plot shows the relationship between {var1.replace('_', ' ')} and {var2.replace('_', ' ')}.
+
+            Key points to consider:
+            1. Look for any clear patterns or trends in the data.
+            2. Consider the strength and direction of any relationship you observe.
+            3. Think about how this relationship might impact your analysis or business decisions.
+            4. Consider if there might be any confounding variables affecting this relationship.
+
+            Remember that correlation does not imply causation. Further analysis may be needed to understand the nature of any observed relationship.
+        """, icon="ℹ️")
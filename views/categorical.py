@@ -0,0 +1,94 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from utils.registry import CUSTOMER
+
+COLUMNS = "categorical"
+
+
+def render(ctx):
+    st.header("Categorical Univariate Analysis")
+    st.write("")
+    st.write("")
+
+    categorical_columns = ctx.columns_of("categorical")
+    if not categorical_columns:
+        st.info(f"{ctx.dataset.name} has no categorical columns.", icon="ℹ️")
+        return
+
+    profile = ctx.profile
+    default = ctx.dataset.default("categorical", categorical_columns)
+
+    selected_column = st.selectbox(
+        f"Select a categorical column for analysis ({default.replace('_', ' ').title()} is the default view)",
+        [default] + [col for col in categorical_columns if col != default],
+        index=0
+    )
+
+    st.write("If you're interested in analyzing other categorical variables, you can select them from the dropdown above.")
+
+    def create_categorical_chart(profile, column):
+        column_counts = profile.value_counts(column)
+
+        sort_order = ctx.dataset.sort_order(column)
+        if sort_order:
+            column_counts[column] = pd.Categorical(column_counts[column], categories=sort_order, ordered=True)
+            column_counts = column_counts.sort_values(column)
+        else:
+            sort_order = column_counts[column].tolist()
+
+        bar_chart = alt.Chart(column_counts).mark_bar(cornerRadiusTopLeft=25, cornerRadiusTopRight=25).encode(
+            x=alt.X(f"{column}:N", sort=sort_order, title=column.replace('_', ' ').capitalize(), axis=alt.Axis(labelAngle=0)),
+            y=alt.Y("count:Q", title="Count"),
+            color=alt.Color(f"{column}:N", legend=None, scale=alt.Scale(scheme='blues')),
+            tooltip=[alt.Tooltip(f"{column}:N", title=column.replace('_', ' ').capitalize()), alt.Tooltip("count:Q", title="Count")]
+        ).properties(
+            height=500
+        )
+
+        text = bar_chart.mark_text(
+            align='center',
+            baseline='middle',
+            dy=-20,
+            fontSize=20
+        ).encode(
+            text="count:Q"
+        )
+
+        combined_chart = (bar_chart + text).configure_axis(
+            labelFontSize=16,
+            titleFontSize=18,
+            grid=False
+        ).configure_view(
+            strokeOpacity=0
+        )
+
+        return combined_chart
+
+    chart = create_categorical_chart(profile, selected_column)
+    ctx.chart(chart)
+
+    with st.expander("Profile of every categorical column"):
+        st.dataframe(profile.summary("categorical"), use_container_width=True)
+
+    if ctx.dataset is CUSTOMER and selected_column == "education":
+        st.info("""
+            From the plot, it's clear that the number of high school and university clients is roughly the same, while the 'none' category is significantly smaller by comparison. However, there are a few issues to address:
+
+            - The 'none' category is ambiguous. It might include people who aren't currently in school, those who didn't complete their education, or other possibilities. Additionally, there's no representation for primary or junior high school, and no explanation is given for this omission.
+            - The stark contrast between the 'none' category and the high school and university categories is unclear. This discrepancy might be due to data collected from a location where high school and university students are prevalent, random chance, or other factors.
+
+            More details about the dataset and its collection process would be helpful.
+        """, icon="ℹ️")
+    else:
+        st.info(f"""
+            This chart shows the distribution of the '{selected_column.replace('_', ' ')}' variable in the dataset. 
+            You can observe the frequency of each category within this variable.
+
+            For a more detailed analysis of this variable, consider:
+            1. The overall distribution and any notable patterns
+            2. The presence of any outliers or unusual categories
+            3. How this variable might relate to other variables in the dataset
+            4. Any potential implications for your analysis or business decisions
+        """, icon="ℹ️")
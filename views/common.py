@@ -0,0 +1,228 @@
+import hashlib
+from functools import cached_property
+
+import streamlit as st
+
+from utils.aggregation import binned_scatter, boxplot_summary
+from utils.bitmap import build_bitmap_index
+from utils.cube import build_cube
+from utils.pipeline import config_key
+from utils.profiling import profile_dataframe, update_profile
+from utils.sketches import sketch_file
+from utils.storage import file_fingerprint
+from utils.store import appended_since, column_kinds, load_clean_data
+
+# The newest cube and profile per dataset and column set. A version that only appended
+# rows to one of them is updated from it instead of being rebuilt from every row.
+_latest = {}
+
+
+# Cached aggregates, keyed on the data version rather than by hashing the frame
+@st.cache_data(max_entries=256)
+def cached_boxplot(_df, data_version, value_col, group_col=None):
+    return boxplot_summary(_df, value_col, group_col)
+
+
+@st.cache_data(max_entries=256)
+def cached_scatter(_df, data_version, x_col, y_col):
+    return binned_scatter(_df, x_col, y_col)
+
+
+def _incremental(key, data_version, appended, build, update):
+    """
+    Build an aggregate for `data_version`, or update the latest one when the data only gained rows since.
+
+    `update(previous, start)` may raise ValueError when the new rows cannot be merged,
+    e.g. because they brought a new level; the aggregate is then rebuilt.
+    """
+
+    latest = _latest.get(key)
+    value = None
+    if appended and appended["version"] == data_version and latest and latest[0] == appended["parent"]:
+        try:
+            value = update(latest[1], appended["start"])
+        except ValueError:
+            value = None
+    if value is None:
+        value = build()
+    _latest[key] = (data_version, value)
+    return value
+
+
+# Built once per data version and column set, and shared by every session
+@st.cache_resource(max_entries=8)
+def get_cube(_df, data_version, columns, outcome=None, _dataset=None):
+    columns = list(columns)
+    if _dataset is None:
+        return build_cube(_df, columns, outcome=outcome)
+    return _incremental(
+        ("cube", _dataset.path, tuple(columns), outcome),
+        data_version,
+        appended_since(_dataset.path, _dataset.pipeline),
+        lambda: build_cube(_df, columns, outcome=outcome),
+        lambda cube, start: cube.merge(build_cube(_df.iloc[start:], columns, outcome=outcome)),
+    )
+
+
+@st.cache_resource(max_entries=8, show_spinner="Profiling columns...")
+def get_profile(_df, data_version, columns, _dataset=None):
+    df = _df[list(columns)]
+    if _dataset is None:
+        return profile_dataframe(df)
+    return _incremental(
+        ("profile", _dataset.path, columns),
+        data_version,
+        appended_since(_dataset.path, _dataset.pipeline),
+        lambda: profile_dataframe(df),
+        lambda profile, start: update_profile(profile, df, start),
+    )
+
+
+# Keyed on the source file itself, so sketching never waits for the cleaned copy to be built
+@st.cache_resource(max_entries=4, show_spinner="Sketching columns...")
+def get_sketch(path, fingerprint, pipeline_key, _config):
+    return sketch_file(path, _config)
+
+
+@st.cache_resource(max_entries=4, show_spinner="Indexing categories...")
+def get_bitmap_index(_df, data_version, columns):
+    return build_bitmap_index(_df, list(columns))
+
+
+# The rows of a filter combination, shared by every session that picks it
+@st.cache_resource(max_entries=8, show_spinner="Filtering rows...")
+def get_filtered(_df, data_version, columns, filters, _index):
+    return _df.take(_index.rows(dict(filters)))
+
+
+def filter_index(dataset):
+    """
+    The bitmap index over the categorical columns of `dataset`, built once per data version.
+    """
+
+    columns = [col for col, kind in column_kinds(dataset.path, dataset.pipeline).items() if kind == "categorical"]
+    df, data_version = load_clean_data(dataset.path, dataset.pipeline, columns=columns)
+    return get_bitmap_index(df, data_version, tuple(columns))
+
+
+def filter_controls(dataset):
+    """
+    Sidebar widgets that narrow every page down to the rows with the chosen levels.
+
+    Returns:
+    -------
+    tuple of (dict, int or None)
+        The chosen levels by column, as accepted by `PageContext`, and how many rows
+        match them (None when nothing is filtered).
+    """
+
+    index = filter_index(dataset)
+    if not index.columns:
+        return {}, None
+
+    with st.expander("Filters"):
+        columns = st.multiselect("Filter by", index.columns, format_func=dataset.title, key=f"filters:{dataset.name}")
+        filters = {}
+        for col in columns:
+            labels = dataset.value_labels.get(col, {})
+            chosen = st.multiselect(
+                dataset.title(col), index.levels(col), format_func=lambda level, labels=labels: labels.get(str(level), level),
+                key=f"filters:{dataset.name}:{col}"
+            )
+            if chosen:
+                filters[col] = chosen
+        if not filters:
+            return {}, None
+        matching = index.count(filters)
+        st.caption(f"{matching:,} of {index.n_rows:,} rows match")
+    return filters, matching
+
+
+class PageContext:
+    """
+    Everything a page draws from, loaded on first use.
+
+    Parameters:
+    ----------
+    dataset : utils.registry.Dataset
+        The dataset being explored.
+    columns : str, list of str or None
+        The columns the page reads: None for every categorical and numerical column,
+        'categorical' or 'numerical' for every column of that kind, or an explicit list.
+        Only these are loaded.
+    approximate : bool
+        Whether univariate statistics should come from the streaming sketches. Ignored with filters.
+        The profile then never loads the dataset, so pages must not read `df` while it is set.
+    timer : utils.telemetry.RerunTimer
+        Timer for the current rerun.
+    filters : dict, optional
+        Levels to keep by categorical column, from `filter_controls`. Every page then
+        sees only the matching rows, and its aggregates are computed for those rows alone.
+    """
+
+    def __init__(self, dataset, columns, approximate, timer, filters=None):
+        self.dataset = dataset
+        self.spec = columns
+        self.timer = timer
+        self.filters = tuple(sorted((col, tuple(levels)) for col, levels in (filters or {}).items()))
+        # The sketches stream the whole file, so filtered rows are always summarised exactly
+        self.approximate = approximate and not self.filters
+
+    @cached_property
+    def kinds(self):
+        if self.spec == []:
+            return {}
+        kinds = column_kinds(self.dataset.path, self.dataset.pipeline)
+        if self.spec is None:
+            return {col: kind for col, kind in kinds.items() if kind != "other"}
+        if isinstance(self.spec, str):
+            return {col: kind for col, kind in kinds.items() if kind == self.spec}
+        return {col: kinds[col] for col in self.spec}
+
+    @property
+    def columns(self):
+        return list(self.kinds)
+
+    def columns_of(self, kind):
+        return [col for col, k in self.kinds.items() if k == kind]
+
+    @cached_property
+    def data(self):
+        df, data_version = load_clean_data(self.dataset.path, self.dataset.pipeline, columns=self.columns)
+        if self.filters:
+            df = get_filtered(df, data_version, tuple(self.columns), self.filters, filter_index(self.dataset))
+            # Aggregates cached by version are then kept apart for every filter combination
+            data_version = f"{data_version}-{hashlib.sha1(repr(self.filters).encode()).hexdigest()[:8]}"
+        self.timer.mark("data_loaded")
+        return df, data_version
+
+    @property
+    def df(self):
+        return self.data[0]
+
+    @property
+    def data_version(self):
+        return self.data[1]
+
+    @property
+    def source(self):
+        """
+        The dataset whose aggregates can be updated when rows are appended to it, or None for filtered rows.
+        """
+
+        return None if self.filters else self.dataset
+
+    @cached_property
+    def profile(self):
+        if self.approximate:
+            path, config = self.dataset.path, self.dataset.pipeline
+            return get_sketch(path, file_fingerprint(path), config_key(config), config)
+        return get_profile(self.df, self.data_version, tuple(self.columns), self.source)
+
+    @cached_property
+    def cube(self):
+        target = self.dataset.target if self.dataset.target in self.columns else None
+        return get_cube(self.df, self.data_version, tuple(self.columns_of("categorical")), target, self.source)
+
+    def chart(self, chart):
+        self.timer.chart(chart, use_container_width=True)
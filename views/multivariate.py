@@ -0,0 +1,84 @@
+import altair as alt
+import streamlit as st
+
+from utils.registry import CUSTOMER
+
+# Categorical columns to cross, including the target whose rate is shown
+COLUMNS = "categorical"
+
+
+def render(ctx):
+    header = st.empty()
+    st.write("")
+    st.write("")
+
+    target = ctx.dataset.target
+    candidates = [col for col in ctx.columns_of("categorical") if col != target]
+    if target not in ctx.columns or len(candidates) < 2:
+        header.header("Multivariate Analysis")
+        st.info(f"{ctx.dataset.name} needs a boolean target and at least two other categorical columns for this analysis.", icon="ℹ️")
+        return
+
+    default_index, default_columns = ctx.dataset.default("multivariate", candidates)
+    col1, col2 = st.columns(2)
+    with col1:
+        index_col = st.selectbox("Select the rows", candidates, index=candidates.index(default_index), format_func=ctx.dataset.title)
+    with col2:
+        other_columns = [col for col in candidates if col != index_col]
+        columns_col = st.selectbox(
+            "Select the columns", other_columns,
+            index=other_columns.index(default_columns) if default_columns in other_columns else 0,
+            format_func=ctx.dataset.title
+        )
+
+    index_title, columns_title, rate_title = ctx.dataset.title(index_col), ctx.dataset.title(columns_col), ctx.dataset.target_label
+    header.header(f"{index_title} & {columns_title} vs {rate_title} Multivariate Analysis")
+
+    pivot_table = ctx.cube.claim_rate(index_col, columns_col)
+    pivot_table.columns = pivot_table.columns.astype(str)
+    pivot_table = pivot_table.rename(columns=ctx.dataset.value_labels.get(columns_col, {})).reset_index()
+
+    df_melted = pivot_table.melt(id_vars=index_col, var_name=columns_col, value_name='rate')
+
+    heatmap = alt.Chart(df_melted).mark_rect().encode(
+        x=alt.X(f'{columns_col}:N', title=columns_title),
+        y=alt.Y(f'{index_col}:N', title=index_title, sort=ctx.dataset.sort_order(index_col)),
+        color=alt.Color('rate:Q', scale=alt.Scale(scheme='blues'), title=rate_title),
+        tooltip=[
+            alt.Tooltip(f'{index_col}:N', title=index_title),
+            alt.Tooltip(f'{columns_col}:N', title=columns_title),
+            alt.Tooltip('rate:Q', format='.2%', title=rate_title)
+        ]
+    )
+
+    text = alt.Chart(df_melted).mark_text(align='center', baseline='middle', fontSize=24, dx=0, dy=0).encode(
+        x=alt.X(f'{columns_col}:N'),
+        y=alt.Y(f'{index_col}:N', sort=ctx.dataset.sort_order(index_col)),
+        text=alt.Text('rate:Q', format='.2%'),
+        color=alt.value('black')
+    )
+
+    combined_chart = (heatmap + text).properties(
+        height=500,
+        width=500
+    )
+
+    combined_chart = combined_chart.configure_axis(
+        labelFontSize=16,
+        titleFontSize=18
+    ).configure_view(
+        strokeOpacity=0
+    )
+
+    ctx.chart(combined_chart)
+
+    if ctx.dataset is not CUSTOMER or [index_col, columns_col] != ["driving_experience", "married"]:
+        return
+
+    st.info("""
+        The plot shows that as driving experience decreases, the claim rate increases. This suggests that less experienced drivers tend to file more insurance claims. Furthermore, within each category of driving experience, individuals who are not married consistently exhibit higher claim rates compared to those who are married.
+
+        This pattern implies that driving experience is a significant factor influencing claim rates, with less experienced drivers being more prone to accidents and, consequently, more likely to make claims. The consistently higher claim rates among unmarried individuals could indicate several underlying factors. For instance, unmarried drivers might have different driving behaviors or risk profiles compared to married drivers. They may engage in riskier driving practices or have different lifestyle-related factors that impact their driving.
+
+        Additionally, the higher claim rates among unmarried drivers might be influenced by factors such as social or economic conditions that affect their driving patterns. It could also reflect differences in the way married and unmarried individuals approach vehicle ownership and insurance.
+    """, icon="ℹ️")
@@ -0,0 +1,145 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from utils.charts import boxplot_chart, histogram_chart
+from utils.kde import grouped_kde, kde_frame
+from utils.registry import CUSTOMER
+from views.common import cached_boxplot
+
+# Every column: numerical ones to plot and categorical ones to split densities by
+COLUMNS = None
+
+
+@st.cache_data(max_entries=256)
+def cached_kde(_df, data_version, column, bw_method, group_col=None):
+    if group_col is None:
+        return kde_frame(_df[column], bw_method=bw_method)
+    return grouped_kde(_df, column, group_col, bw_method=bw_method)
+
+
+def render(ctx):
+    st.header("Numerical Univariate Analysis")
+    st.write("")
+    st.write("")
+
+    numerical_columns = ctx.columns_of("numerical")
+    if not numerical_columns:
+        st.info(f"{ctx.dataset.name} has no numerical columns.", icon="ℹ️")
+        return
+
+    profile = ctx.profile
+    default = ctx.dataset.default("numerical", numerical_columns)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        selected_column = st.selectbox(
+            f"Select a numerical column for analysis ({default.replace('_', ' ').title()} is the default view)",
+            [default] + [col for col in numerical_columns if col != default],
+            index=0
+        )
+
+    with col2:
+        plot_type = st.selectbox("Select the plot type", ["Histogram", "Distribution Plot", "Boxplot"])
+
+    st.write("If you're interested in analyzing other numerical variables, you can select them from the dropdown above.")
+
+    if plot_type == "Histogram":
+        bins = profile.histogram(selected_column)
+        chart = histogram_chart(bins, selected_column).properties(
+            height=400
+        ).configure_axis(
+            labelFontSize=16,
+            titleFontSize=18,
+            grid=False,
+        ).configure_view(
+            strokeOpacity=0
+        )
+        ctx.chart(chart)
+
+    elif plot_type == "Distribution Plot":
+        col3, col4 = st.columns(2)
+        with col3:
+            bw_method = st.selectbox("Select the bandwidth rule", ["scott", "silverman"], format_func=str.title)
+        with col4:
+            categorical_columns = ctx.columns_of("categorical")
+            group_col = st.selectbox(
+                "Split the density by", [None] + categorical_columns, format_func=lambda col: "None" if col is None else col.replace('_', ' ').title(),
+                # The sketches summarise each column on its own, not per level of another column
+                disabled=ctx.approximate, help="Not available with approximate statistics" if ctx.approximate else None
+            )
+
+        if ctx.approximate:
+            # A split chosen before approximate statistics were turned on stays selected in the disabled box
+            group_col = None
+            kde_data = profile.kde(selected_column, bw_method)
+        else:
+            kde_data = cached_kde(ctx.df, ctx.data_version, selected_column, bw_method, group_col)
+
+        if group_col is None:
+            chart = alt.Chart(kde_data).mark_area().encode(
+                alt.X(f"{selected_column}:Q", title=selected_column.replace('_', ' ').title()),
+                y=alt.Y("density:Q", title="Density"),
+                tooltip=[alt.Tooltip(f"{selected_column}:Q", title=selected_column.replace('_', ' ').title()), alt.Tooltip("density:Q", title="Density")]
+            )
+        else:
+            group_order = ctx.df[group_col].cat.categories.tolist() if isinstance(ctx.df[group_col].dtype, pd.CategoricalDtype) else None
+            chart = alt.Chart(kde_data).mark_area(opacity=0.5).encode(
+                alt.X(f"{selected_column}:Q", title=selected_column.replace('_', ' ').title()),
+                y=alt.Y("density:Q", title="Density", stack=None),
+                color=alt.Color(f"{group_col}:N", scale=alt.Scale(scheme='blues'), sort=group_order, legend=alt.Legend(title=group_col.replace('_', ' ').title())),
+                tooltip=[alt.Tooltip(f"{group_col}:N", title=group_col.replace('_', ' ').title()), alt.Tooltip(f"{selected_column}:Q", title=selected_column.replace('_', ' ').title()), alt.Tooltip("density:Q", title="Density")]
+            )
+
+        chart = chart.properties(
+            height=400
+        ).configure_axis(
+            labelFontSize=16,
+            titleFontSize=18,
+            grid=False,
+        ).configure_view(
+            strokeOpacity=0
+        )
+        ctx.chart(chart)
+
+    elif plot_type == "Boxplot":
+        if ctx.approximate:
+            summary, outliers = profile.boxplot(selected_column)
+        else:
+            summary, outliers = cached_boxplot(ctx.df, ctx.data_version, selected_column)
+        chart = boxplot_chart(summary, outliers, selected_column).properties(
+            height=400
+        ).configure_axis(
+            labelFontSize=16,
+            titleFontSize=18,
+            grid=False,
+        ).configure_view(
+            strokeOpacity=0
+        )
+        ctx.chart(chart)
+
+    st.dataframe(profile.describe(selected_column), use_container_width=True)
+
+    with st.expander("Profile of every numerical column"):
+        st.dataframe(profile.summary("numerical"), use_container_width=True)
+
+    if ctx.dataset is CUSTOMER and selected_column == "annual_mileage":
+        st.info("""
+            Visually, the annual mileage column appears to be normally distributed, as evidenced by its symmetrical histogram and bell-shaped curve.
+
+            A normal distribution is beneficial because it indicates that the data is spread in a predictable manner, with most values concentrated around the mean and fewer values occurring at the extremes. This distribution is ideal for applying various statistical methods, many of which assume normality. For example, techniques such as regression analysis, hypothesis testing, and confidence intervals rely on the assumption that the data follows a normal distribution.
+
+            As the annual mileage column demonstrates a normal distribution, it is well-suited for further analysis using these statistical methods.
+        """, icon="ℹ️")
+    else:
+        st.info(f"""
+            This analysis shows the distribution of the '{selected_column}' variable in the dataset. 
+
+            Key points to consider:
+            1. Shape of the distribution: Is it normal, skewed, or multi-modal?
+            2. Central tendency: Where is the center of the data (mean, median)?
+            3. Spread: How spread out are the values (standard deviation, range)?
+            4. Outliers: Are there any unusual values that stand out?
+
+            Consider how this distribution might impact your analysis or business decisions, and how it might relate to other variables in the dataset.
+        """, icon="ℹ️")
@@ -0,0 +1,78 @@
+import datetime
+
+import altair as alt
+import streamlit as st
+
+from utils.timeseries import aep_fingerprint, aep_sources, build_rollups, load_aep_hourly, rollup_window
+
+# Reads the AEP load files rather than the customer dataset
+COLUMNS = []
+
+
+@st.cache_resource(max_entries=2, show_spinner="Loading AEP hourly load data...")
+def get_aep_rollups(sources_version):
+    return build_rollups(load_aep_hourly())
+
+
+def render(ctx):
+    st.header("AEP Hourly Energy Consumption Time Series Analysis")
+    st.write("")
+    st.write("")
+
+    rollups = get_aep_rollups(aep_fingerprint(aep_sources()))
+    hourly = rollups["hourly"]
+    first_day, last_day = hourly.index.min().date(), hourly.index.max().date()
+
+    start, end = st.slider(
+        "Select the date range",
+        min_value=first_day,
+        max_value=last_day,
+        value=(first_day, last_day),
+        format="DD MMM YYYY"
+    )
+
+    resolution, window = rollup_window(rollups, start, datetime.datetime.combine(end, datetime.time.max))
+
+    st.write(f"Showing {resolution} minimum, mean and maximum load ({len(window):,} points). Narrow the range to zoom in to finer resolutions, down to hourly readings.")
+
+    tooltip = [
+        alt.Tooltip('datetime:T', title='Period Start'),
+        alt.Tooltip('min:Q', format=',.0f', title='Min (MW)'),
+        alt.Tooltip('mean:Q', format=',.0f', title='Mean (MW)'),
+        alt.Tooltip('max:Q', format=',.0f', title='Max (MW)')
+    ]
+
+    band = alt.Chart(window).mark_area(opacity=0.3).encode(
+        x=alt.X('datetime:T', title="Date"),
+        y=alt.Y('min:Q', title="Load (MW)", scale=alt.Scale(zero=False)),
+        y2='max:Q',
+        tooltip=tooltip
+    )
+
+    line = alt.Chart(window).mark_line().encode(
+        x=alt.X('datetime:T'),
+        y=alt.Y('mean:Q'),
+        tooltip=tooltip
+    )
+
+    combined_chart = (band + line).properties(
+        height=500
+    ).configure_axis(
+        labelFontSize=16,
+        titleFontSize=18,
+        grid=False
+    ).configure_view(
+        strokeOpacity=0
+    )
+
+    ctx.chart(combined_chart)
+
+    st.info("""
+        This chart shows the hourly electricity load of the AEP region. The line is the mean load over each period and the shaded band spans its minimum and maximum.
+
+        Key points to consider:
+        1. Seasonality: load typically peaks in winter and summer, when heating and cooling demand is highest.
+        2. Trend: look for long-term growth or decline in the mean load across years.
+        3. Volatility: a wide band means load swings a lot within the period, for example between day and night.
+        4. Anomalies: unusually high peaks or drops may point to extreme weather or data issues.
+    """, icon="ℹ️")